@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark full, no-op, and one-post-changed builds on synthetic corpora.
+Run from the docs directory: python benchmarks/bench_build.py --sizes 1000 10000
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+DOCS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DOCS_DIR))
+
+# Bump when generated posts change, so cached corpora are regenerated
+CORPUS_VERSION = 1
+SCENARIOS = ("full", "noop", "changed")
+
+WORDS = """
+adversary anonymity attack audit bandwidth block cache channel cipher circuit
+client commitment compiler consensus cryptography curve data decrypt deniable
+differential entropy exploit field function graph hash header integrity kernel
+key latency ledger library memory metadata model network node nonce oracle
+packet padding parser privacy protocol proof query random relay request
+sandbox schema secret server session signal signature socket source stream
+threat token traffic trust update verify vector version website
+""".split()
+
+CODE_SAMPLES = {
+    "python": "def {name}(items):\n    total = 0\n    for item in items:\n        total += item * {n}\n    return total\n",
+    "go": "func {name}(items []int) int {{\n\ttotal := 0\n\tfor _, item := range items {{\n\t\ttotal += item * {n}\n\t}}\n\treturn total\n}}\n",
+    "rust": "fn {name}(items: &[i64]) -> i64 {{\n    items.iter().map(|item| item * {n}).sum()\n}}\n",
+    "javascript": "function {name}(items) {{\n  return items.reduce((total, item) => total + item * {n}, 0);\n}}\n",
+    "": "$ ./{name} --count {n}\nok\n",
+}
+
+
+def sentence(rng, low=8, high=20):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+
+def paragraph(rng, refs, footnotes):
+    parts = [sentence(rng) for _ in range(rng.randint(3, 6))]
+    if rng.random() < 0.3:
+        parts.insert(1, f"The `{rng.choice(WORDS)}` value is *{rng.choice(WORDS)}*.")
+    if rng.random() < 0.3:
+        ref = f"ref{len(refs) + 1}"
+        refs.append(ref)
+        parts.append(f"See [{rng.choice(WORDS)}][{ref}] for more.")
+    if rng.random() < 0.2:
+        note = len(footnotes) + 1
+        footnotes.append(note)
+        parts[-1] += f"[^{note}]"
+    return " ".join(parts)
+
+
+def table(rng):
+    rows = ["| Name | Bytes | Notes |", "| --- | ---: | --- |"]
+    for _ in range(rng.randint(2, 6)):
+        rows.append(f"| {rng.choice(WORDS)} | {rng.randint(1, 99999)} | {sentence(rng, 3, 6)} |")
+    return "\n".join(rows)
+
+
+def code_block(rng, number):
+    language = rng.choice(list(CODE_SAMPLES))
+    code = CODE_SAMPLES[language].format(name=f"{rng.choice(WORDS)}_{number}", n=rng.randint(2, 9))
+    return f"```{language}\n{code}```"
+
+
+def front_matter(index, title, day, slug, tags, draft):
+    """Alternate between the TOML (+++) and YAML (---) styles the site uses"""
+    if index % 2:
+        lines = [f'title = "{title}"', f'date = "{day.isoformat()}"', f'slug = "{slug}"',
+                 "tags = [" + ", ".join(f'"{tag}"' for tag in tags) + "]"]
+        if draft:
+            lines.append("draft = true")
+        return "+++\n" + "\n".join(lines) + "\n+++\n"
+    # YAML posts on the site carry full timestamps
+    lines = [f'title: "{title}"', f"date: {day.isoformat()}T18:50:23-04:00", f"slug: {slug}",
+             "tags: [" + ", ".join(tags) + "]"]
+    if draft:
+        lines.append("draft: true")
+    return "---\n" + "\n".join(lines) + "\n---\n"
+
+
+def generate_post(index, seed):
+    """One post's Markdown; the same index and seed always give the same text"""
+    rng = random.Random(f"{seed}-{index}")
+    title = sentence(rng, 3, 7).rstrip(".")
+    day = date(2010, 1, 1) + timedelta(days=rng.randint(0, 5000))
+    tags = rng.sample(WORDS, 3)
+    refs = []
+    footnotes = []
+
+    blocks = []
+    for number in range(rng.randint(4, 12)):
+        roll = rng.random()
+        if roll < 0.15:
+            blocks.append(f"## {sentence(rng, 2, 5).rstrip('.')}")
+        elif roll < 0.35:
+            blocks.append(code_block(rng, number))
+        elif roll < 0.45:
+            blocks.append(table(rng))
+        elif roll < 0.55:
+            blocks.append("\n".join(f"- {sentence(rng, 3, 8)}" for _ in range(rng.randint(2, 5))))
+        blocks.append(paragraph(rng, refs, footnotes))
+    blocks += [f"[^{note}]: {sentence(rng, 4, 10)}" for note in footnotes]
+    blocks += [f"[{ref}]: https://example.com/{rng.choice(WORDS)}/{ref}" for ref in refs]
+
+    head = front_matter(index, title, day, f"post-{index}", tags, draft=rng.random() < 0.02)
+    return head + "\n" + "\n\n".join(blocks) + "\n"
+
+
+def ensure_corpus(root, size, seed):
+    """Generate a corpus of size posts under root/post unless it already exists"""
+    stamp = root / "corpus.json"
+    wanted = {"version": CORPUS_VERSION, "size": size, "seed": seed}
+    try:
+        if json.loads(stamp.read_text()) == wanted:
+            return
+    except (OSError, ValueError):
+        pass
+
+    shutil.rmtree(root, ignore_errors=True)
+    post_dir = root / "post"
+    post_dir.mkdir(parents=True)
+    for index in range(size):
+        (post_dir / f"post-{index:06d}.md").write_text(generate_post(index, seed), encoding="utf-8")
+    stamp.write_text(json.dumps(wanted))
+
+
+def change_post(path, run):
+    """Append a paragraph so the post's hash, and only its hash, changes"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"\nEdited for benchmark run {run}.\n")
+
+
+def run_build(source_dir, output_dir, incremental, jobs):
+    """Time one build in a fresh interpreter; returns its timing and peak RSS"""
+    command = [sys.executable, __file__, "--child", json.dumps({
+        "source_dir": str(source_dir), "output_dir": str(output_dir),
+        "incremental": incremental, "jobs": jobs,
+    })]
+    completed = subprocess.run(command, cwd=DOCS_DIR, capture_output=True, text=True)
+    if completed.returncode:
+        sys.exit(f"Build failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def child(arguments):
+    """Run a single build with its output silenced, then report on stdout"""
+    options = json.loads(arguments)
+    from sitegen.builder import StaticSiteBuilder
+
+    builder = StaticSiteBuilder(**options)
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        start = time.perf_counter()
+        try:
+            builder.build()
+        finally:
+            sys.stdout = stdout
+    seconds = time.perf_counter() - start
+    usage = [resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    print(json.dumps({"seconds": seconds, "maxrss_mb": max(usage) / 1024}))
+
+
+def bench_size(workdir, size, args):
+    source_dir = workdir / f"corpus-{size}"
+    output_dir = workdir / f"out-{size}"
+    started = time.perf_counter()
+    ensure_corpus(source_dir, size, args.seed)
+    print(f"{size} posts (corpus ready in {time.perf_counter() - started:.1f}s)")
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    output_dir.mkdir(parents=True)
+    shutil.copy(DOCS_DIR / "base-template.html", output_dir)
+
+    results = {}
+    changed = source_dir / "post" / f"post-{size // 2:06d}.md"
+    for scenario in SCENARIOS:
+        runs = []
+        for run in range(1 if scenario == "full" else args.repeat):
+            if scenario == "changed":
+                change_post(changed, run)
+            runs.append(run_build(source_dir, output_dir, incremental=scenario != "full", jobs=args.jobs))
+        best = min(runs, key=lambda result: result["seconds"])
+        results[scenario] = {
+            "seconds": round(best["seconds"], 4),
+            "maxrss_mb": round(max(result["maxrss_mb"] for result in runs), 1),
+            "runs": len(runs),
+        }
+        print(f"  {scenario:8} {best['seconds']:9.3f}s  {results[scenario]['maxrss_mb']:7.1f} MB")
+
+    # The edits only live in the generated corpus; regenerate it next time
+    (source_dir / "corpus.json").unlink()
+    if not args.keep:
+        shutil.rmtree(output_dir)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each timing against the baseline; returns the regressions"""
+    regressions = []
+    print(f"Compared with baseline from {baseline['meta'].get('date', '?')} "
+          f"(tolerance {tolerance:.0%}):")
+    for size, scenarios in results["sizes"].items():
+        for scenario, result in scenarios.items():
+            old = baseline["sizes"].get(size, {}).get(scenario)
+            if old is None:
+                continue
+            ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions.append((size, scenario, ratio))
+            print(f"  {size:>6} {scenario:8} {old['seconds']:9.3f}s -> {result['seconds']:9.3f}s "
+                  f"({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000],
+                        help="corpus sizes to benchmark, in posts (e.g. 1000 10000 50000)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="render jobs passed to the builder")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of the no-op and changed builds; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the generated corpora")
+    parser.add_argument("--workdir", type=Path, default=DOCS_DIR / ".build-cache" / "bench",
+                        help="where corpora and build outputs are kept")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=DOCS_DIR / "benchmarks" / "build-baseline.json",
+                        help="results to compare against, if the file exists")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="slowdown over the baseline, as a fraction, that counts as a regression")
+    parser.add_argument("--keep", action="store_true", help="keep build outputs in the work directory")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    results = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "jobs": args.jobs,
+            "seed": args.seed,
+            "corpus_version": CORPUS_VERSION,
+        },
+        "sizes": {},
+    }
+    for size in args.sizes:
+        results["sizes"][str(size)] = bench_size(args.workdir, size, args)
+
+    text = json.dumps(results, indent=1) + "\n"
+    if args.output:
+        args.output.write_text(text)
+        print(f"Results written to {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(text)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            sys.exit(f"{len(regressions)} timing(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
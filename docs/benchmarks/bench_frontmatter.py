@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark front matter parsing against the builder's previous code path.
+Run from the docs directory: python benchmarks/bench_frontmatter.py
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import frontmatter
+
+from sitegen.frontmatter import parse_post
+
+
+def legacy_parse(file_content, default_slug):
+    """The +++ line parser and python-frontmatter path convert_post() used to run"""
+    if file_content.startswith('+++'):
+        frontmatter_match = re.match(r'^\+\+\+(.*?)\+\+\+\s*(.*)', file_content, re.DOTALL)
+        if frontmatter_match:
+            post_metadata = {}
+            for line in frontmatter_match.group(1).strip().split('\n'):
+                line = line.strip()
+                if '=' in line:
+                    key, value = line.split('=', 1)
+                elif ':' in line:
+                    key, value = line.split(':', 1)
+                else:
+                    continue
+                key = key.strip()
+                value = value.strip().strip('"').strip("'")
+                if value.lower() == 'true':
+                    value = True
+                elif value.lower() == 'false':
+                    value = False
+                if isinstance(value, str) and value.startswith('[') and value.endswith(']'):
+                    value = [item.strip().strip('"').strip("'") for item in value[1:-1].split(',')]
+                if key == 'date':
+                    try:
+                        from dateutil import parser
+                        value = parser.parse(value).replace(tzinfo=None)
+                    except Exception:
+                        value = datetime.now()
+                post_metadata[key] = value
+
+            class Post:
+                def __init__(self, metadata, content):
+                    self.metadata = metadata
+                    self.content = content
+
+                def get(self, key, default=None):
+                    return self.metadata.get(key, default)
+
+            post = Post(post_metadata, frontmatter_match.group(2))
+        else:
+            post = frontmatter.loads(file_content)
+    else:
+        post = frontmatter.loads(file_content)
+
+    date = post.get('date', datetime.now())
+    if hasattr(date, 'tzinfo') and date.tzinfo is not None:
+        date = date.replace(tzinfo=None)
+    elif isinstance(date, str):
+        from dateutil import parser
+        date = parser.parse(date).replace(tzinfo=None)
+    return post.get('title', default_slug), date, post.get('slug', default_slug), post.content
+
+
+def new_parse(file_content, default_slug):
+    meta, content = parse_post(file_content, default_slug)
+    return meta.title, meta.date, meta.slug, content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", default="../content/post", help="directory of Markdown posts")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the posts per timing")
+    args = parser.parse_args()
+
+    sources = [(path.read_text(encoding='utf-8'), path.stem)
+               for path in sorted(Path(args.posts).glob("*.md"))]
+    if not sources:
+        sys.exit(f"No posts found in {args.posts}")
+
+    # Both paths must agree on what they extract before timing means anything
+    for text, stem in sources:
+        old, new = legacy_parse(text, stem), new_parse(text, stem)
+        if old[:3] != new[:3] or old[3].strip() != new[3].strip():
+            print(f"  Warning: parsers disagree on {stem}: {old[:3]} != {new[:3]}")
+
+    def run(parse):
+        for text, stem in sources:
+            parse(text, stem)
+
+    print(f"Parsing {len(sources)} posts x {args.repeat}")
+    results = {}
+    for name, parse in (("legacy", legacy_parse), ("sitegen", new_parse)):
+        best = min(timeit.repeat(lambda: run(parse), number=args.repeat, repeat=5))
+        results[name] = best / (args.repeat * len(sources))
+        print(f"  {name:8} {results[name] * 1e6:8.1f} us/post")
+    print(f"  speedup  {results['legacy'] / results['sitegen']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Measure builder and server startup with python -X importtime.
+Run from the docs directory: python benchmarks/bench_startup.py
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DOCS_DIR = Path(__file__).resolve().parent.parent
+
+# Libraries only the stages that convert, highlight, or resize anything need
+HEAVY_MODULES = ("markdown", "pygments", "yaml", "dateutil", "PIL", "brotli", "tomllib",
+                 "multiprocessing", "concurrent.futures.process")
+
+_IMPORT_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+BUILD_SCRIPT = """
+import sys
+from sitegen.builder import StaticSiteBuilder
+StaticSiteBuilder(output_dir=sys.argv[1], incremental=True).build()
+"""
+
+
+def scenarios(output_dir):
+    """(name, python arguments) of each startup measured"""
+    return [
+        ("import build", ["-c", "import build"]),
+        ("import builder", ["-c", "import sitegen.builder"]),
+        ("no-op build", ["-c", BUILD_SCRIPT, str(output_dir)]),
+        ("import serve", ["-c", "import serve"]),
+    ]
+
+
+def run(arguments, env):
+    """Run python -X importtime; returns (wall seconds, [(module, self us, cumulative us, depth)])"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", *arguments],
+                               cwd=DOCS_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode:
+        sys.exit(f"python {' '.join(arguments[:2])} failed:\n{completed.stderr}")
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_RE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            imports.append((name, int(own), int(cumulative), (len(indent) - 1) // 2))
+    return wall, imports
+
+
+def heavy(imports):
+    return sorted({name for name, *_ in imports
+                   for prefix in HEAVY_MODULES if name == prefix or name.startswith(prefix + ".")})
+
+
+def measure(name, arguments, env, repeat, top):
+    # The first run also writes bytecode, which later runs reuse
+    run(arguments, env)
+    runs = [run(arguments, env) for _ in range(repeat)]
+    wall, imports = min(runs, key=lambda result: result[0])
+    roots = sorted((item for item in imports if item[3] == 0), key=lambda item: item[2], reverse=True)
+    return {
+        "wall_ms": round(wall * 1000, 1),
+        "import_ms": round(sum(own for _, own, _, _ in imports) / 1000, 1),
+        "modules": len(imports),
+        "heavy": heavy(imports),
+        "top": [[module, round(cumulative / 1000, 1)] for module, _, cumulative, _ in roots[:top]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario; the fastest is kept")
+    parser.add_argument("--top", type=int, default=8, help="slowest top-level imports to list")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--allow-heavy", action="store_true",
+                        help="don't fail when a scenario imports one of the heavy libraries")
+    args = parser.parse_args()
+
+    # Measure imports from cached bytecode, as an installed builder would
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    results = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as output_dir:
+        # A full build first, so the measured incremental build has nothing to do
+        shutil.copy(DOCS_DIR / "base-template.html", output_dir)
+        subprocess.run([sys.executable, "-c", BUILD_SCRIPT.replace("incremental=True", "incremental=False"),
+                        output_dir], cwd=DOCS_DIR, env=env, capture_output=True, check=True)
+
+        for name, arguments in scenarios(output_dir):
+            result = measure(name, arguments, env, args.repeat, args.top)
+            results["scenarios"][name] = result
+            print(f"{name}: {result['wall_ms']:.1f} ms wall, {result['import_ms']:.1f} ms in "
+                  f"{result['modules']} imports")
+            for module, cumulative in result["top"]:
+                print(f"  {module:32} {cumulative:7.1f} ms")
+            if result["heavy"]:
+                print(f"  heavy: {', '.join(result['heavy'])}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=1) + "\n")
+        print(f"Results written to {args.output}")
+
+    loaded = [name for name, result in results["scenarios"].items() if result["heavy"]]
+    if loaded and not args.allow_heavy:
+        sys.exit(f"Heavy libraries imported during startup of: {', '.join(loaded)}")
+
+
+if __name__ == "__main__":
+    main()
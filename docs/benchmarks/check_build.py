@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Check site builds for regressions timings would not show.
+Run from the docs directory: python benchmarks/check_build.py
+"""
+
+import argparse
+import contextlib
+import io
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+DOCS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DOCS_DIR))
+
+CHECKS = []
+
+FEED_FILES = ("rss.xml", "atom.xml", "feed.json", "sitemap.xml")
+
+# A post of this site with [^n] footnotes
+FOOTNOTE_POST = "continuous-threat-modeling"
+
+
+class CheckFailed(Exception):
+    """Raised by a check whose build did not produce what it should"""
+
+
+def check(function):
+    CHECKS.append(function)
+    return function
+
+
+def build(output_dir, **options):
+    """Build the site into output_dir with its printed output silenced; returns the builder"""
+    from sitegen.builder import StaticSiteBuilder
+
+    builder = StaticSiteBuilder(source_dir=DOCS_DIR.parent / "content", output_dir=output_dir, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder.build()
+    return builder
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+@check
+def stage_outputs_removed(output_dir):
+    """Dropping --search or the feeds removes their outputs, in full and incremental builds"""
+    for incremental in (False, True):
+        mode = "incremental" if incremental else "full"
+        build(output_dir, search=True, incremental=incremental)
+        expect((output_dir / "search" / "index.html").exists(), f"{mode} --search build wrote no search page")
+        build(output_dir, incremental=incremental)
+        expect(not (output_dir / "search").exists(), f"{mode} build without --search left search/")
+
+        build(output_dir, incremental=incremental)
+        build(output_dir, feeds=False, incremental=incremental)
+        left = [name for name in FEED_FILES if (output_dir / name).exists()]
+        expect(not left, f"{mode} build without feeds left {', '.join(left)}")
+
+    # A config change discards the previous build's digests, not its outputs
+    build(output_dir, search=True)
+    build(output_dir, minify=True, incremental=True)
+    expect(not (output_dir / "search").exists(), "build with changed config left search/")
+
+
+@check
+def footnotes_rendered(output_dir):
+    """[^n] footnotes reach the footnotes extension instead of becoming reference links"""
+    build(output_dir)
+    page = (output_dir / "posts" / f"{FOOTNOTE_POST}.html").read_text(encoding="utf-8")
+    expect('class="footnote-ref"' in page, f"{FOOTNOTE_POST} has no footnote references")
+    expect('class="footnote"' in page, f"{FOOTNOTE_POST} has no footnote list")
+    expect(">^1</a>" not in page, f"{FOOTNOTE_POST} links ^1 as a reference link")
+
+
+@check
+def footnote_markers_not_summarised(output_dir):
+    """Footnote reference numbers stay out of a post's summary"""
+    builder = build(output_dir)
+    summary = next(post['summary'] for post in builder.posts if post['slug'] == FOOTNOTE_POST)
+    # A marker shows up as ^1, or as a digit glued to the word it follows
+    expect("^" not in summary and not re.search(r"[a-z]\d+\b", summary),
+           f"{FOOTNOTE_POST} summary has a footnote marker: {summary!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("checks", nargs="*", help="names of the checks to run (default: all)")
+    args = parser.parse_args()
+
+    selected = [function for function in CHECKS if not args.checks or function.__name__ in args.checks]
+    failures = 0
+    for function in selected:
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_dir = Path(output_dir)
+            shutil.copy(DOCS_DIR / "base-template.html", output_dir)
+            try:
+                function(output_dir)
+            except CheckFailed as e:
+                failures += 1
+                print(f"FAIL {function.__name__}: {e}")
+            else:
+                print(f"ok   {function.__name__}")
+
+    if failures:
+        sys.exit(f"{failures} of {len(selected)} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,429 @@
 #!/usr/bin/env python3
 """
 Simple local server for the static site
+Files are served by a threaded HTTP/1.1 server from an in-memory cache, with
+ETags, Range requests, and pre-compressed .br/.gz siblings. With --watch,
+rebuilds on changes and live-reloads open pages.
 """
 
+import argparse
 import http.server
-import socketserver
+import io
 import os
-import webbrowser
+import re
+import threading
+import time
+import traceback
+import urllib.parse
+from collections import OrderedDict
+from http import HTTPStatus
 from pathlib import Path
 
-def serve_site(port=8000):
+from sitegen.fingerprint import FINGERPRINTED_RE, IMMUTABLE_CACHE_CONTROL, SKIP_SUFFIXES
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = b"""<script>
+(function () {
+    var source = new EventSource('""" + LIVERELOAD_PATH.encode() + b"""');
+    source.addEventListener('reload', function () { location.reload(); });
+})();
+</script>
+"""
+
+
+# Pre-compressed siblings, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class FileCache:
+    """In-memory LRU cache of file contents, invalidated by mtime and size"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_file_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, stat):
+        """Return the contents of path, or None if it is too big to cache"""
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                return entry[1]
+
+        if stat.st_size > self.max_file_bytes:
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= len(old[1])
+            self.entries[path] = (key, data)
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        return data
+
+
+class FileSpan:
+    """Bytes first to last (inclusive) of an open file, read like a file"""
+
+    def __init__(self, f, first, last):
+        f.seek(first)
+        self.f = f
+        self.remaining = last - first + 1
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+class CachingHandler(http.server.SimpleHTTPRequestHandler):
+    """Keep-alive file handler with ETags, Range, and pre-compressed siblings"""
+
+    protocol_version = "HTTP/1.1"
+    cache = FileCache()
+
+    def rewrites(self, path):
+        """True if rewrite() changes this file, which rules out .br/.gz siblings"""
+        return False
+
+    def rewrite(self, path, data):
+        return data
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not urllib.parse.urlsplit(self.path).path.endswith('/') or not os.path.isfile(index):
+                # Directory redirects and listings
+                return super().send_head()
+            path = index
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        if not os.path.isfile(path) or path.endswith("/"):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        ctype = self.guess_type(path)
+        rewritten = self.rewrites(path)
+        byte_range = self.headers.get("Range")
+
+        # Ranges address the identity encoding, so only whole responses
+        # come from a compressed sibling
+        encoding = None
+        if not rewritten and byte_range is None:
+            encoding, path, stat = self.choose_encoding(path, stat)
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}{"-r" if rewritten else ""}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_cache_headers(etag)
+            self.end_headers()
+            return None
+
+        data = self.cache.get(path, stat)
+        if data is None:
+            return self.send_file(path, stat, ctype, etag, encoding, byte_range)
+        if rewritten:
+            data = self.rewrite(path, data)
+
+        status = HTTPStatus.OK
+        content_range = None
+        if byte_range is not None:
+            span = self.parse_range(byte_range, len(data))
+            if span is None:
+                self.send_unsatisfiable(len(data))
+                return None
+            if span != (0, len(data) - 1):
+                status = HTTPStatus.PARTIAL_CONTENT
+                content_range = f"bytes {span[0]}-{span[1]}/{len(data)}"
+                data = data[span[0]:span[1] + 1]
+
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_common_headers(stat, etag, encoding)
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+        return io.BytesIO(data)
+
+    def send_file(self, path, stat, ctype, etag, encoding, byte_range=None):
+        """Stream a file too big for the cache straight from disk, or one range of it"""
+        size = stat.st_size
+        span = (0, size - 1)
+        if byte_range is not None:
+            span = self.parse_range(byte_range, size)
+            if span is None:
+                self.send_unsatisfiable(size)
+                return None
+
+        f = open(path, 'rb')
+        partial = span != (0, size - 1)
+        self.send_response(HTTPStatus.PARTIAL_CONTENT if partial else HTTPStatus.OK)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(span[1] - span[0] + 1))
+        self.send_common_headers(stat, etag, encoding)
+        if partial:
+            self.send_header("Content-Range", f"bytes {span[0]}-{span[1]}/{size}")
+        self.end_headers()
+        return FileSpan(f, *span) if partial else f
+
+    def send_unsatisfiable(self, size):
+        self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.send_header("Content-Range", f"bytes */{size}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_cache_headers(self, etag):
+        """Validator and caching headers, sent on 304s as well as full responses"""
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        # Fingerprinted names change with their contents, so never revalidate
+        if FINGERPRINTED_RE.search(urllib.parse.urlsplit(self.path).path):
+            self.send_header("Cache-Control", IMMUTABLE_CACHE_CONTROL)
+        else:
+            self.send_header("Cache-Control", "no-cache")
+
+    def send_common_headers(self, stat, etag, encoding):
+        self.send_cache_headers(etag)
+        self.send_header("Last-Modified", self.date_time_string(stat.st_mtime))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+
+    def choose_encoding(self, path, stat):
+        """Pick a pre-compressed sibling the client accepts
+
+        Siblings older than the file they compress are stale and ignored.
+        Returns (encoding or None, path, stat) of what to send.
+        """
+        accepted = {token.split(";", 1)[0].strip()
+                    for token in self.headers.get("Accept-Encoding", "").split(",")}
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                sibling_stat = os.stat(path + suffix)
+            except OSError:
+                continue
+            if sibling_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return encoding, path + suffix, sibling_stat
+        return None, path, stat
+
+    @staticmethod
+    def parse_range(header, size):
+        """Parse a single-range Range header into inclusive (first, last)
+
+        Returns None if the range can't be satisfied; multi-range requests
+        are answered with the whole file.
+        """
+        match = RANGE_RE.match(header.strip())
+        if match is None:
+            return (0, size - 1) if size else None
+        first, last = match.groups()
+        if not first:
+            if not last or int(last) == 0:
+                return None
+            return max(size - int(last), 0), size - 1
+        first = int(first)
+        last = min(int(last), size - 1) if last else size - 1
+        if first >= size or first > last:
+            return None
+        return first, last
+
+
+class SiteServer(http.server.ThreadingHTTPServer):
+    """Threaded server with room for bursts of concurrent connections"""
+
+    request_queue_size = 128
+
+
+class LiveReload:
+    """Tells connected browsers when a rebuild has finished"""
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Block until a rebuild newer than generation, or timeout
+
+        Returns the latest generation.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class SiteWatcher(threading.Thread):
+    """Polls the site's sources and rebuilds in-process when they change"""
+
+    def __init__(self, builder, livereload, interval=0.1):
+        super().__init__(daemon=True)
+        self.builder = builder
+        self.livereload = livereload
+        self.interval = interval
+        self.roots = [builder.source_dir, builder.template_path]
+        # Assets without a source directory are edited where they are served
+        # from, next to the files the builder writes among them
+        self.output_roots = []
+        for src, dst in builder.ASSETS:
+            if Path(src).exists():
+                self.roots.append(Path(src))
+            else:
+                self.output_roots.append(builder.output_dir / dst)
+        self.roots += self.output_roots
+
+    def generated(self, path):
+        """True for files the build itself writes into an asset directory"""
+        name = os.path.basename(path)
+        return (FINGERPRINTED_RE.search(name) is not None or os.path.splitext(name)[1] in SKIP_SUFFIXES
+                or os.path.relpath(path, self.builder.output_dir).replace(os.sep, "/") in self.generated_paths)
+
+    def snapshot(self):
+        """Map every watched file to its (mtime, size)"""
+        files = {}
+        self.generated_paths = set(self.builder.generated_assets()) if self.output_roots else set()
+        for root in self.roots:
+            if root.is_file():
+                stat = root.stat()
+                files[str(root)] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            generated = self.generated if root in self.output_roots else None
+            for dirpath, dirnames, filenames in os.walk(root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if generated is not None and generated(path):
+                        continue
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files[path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def rebuild(self):
+        start = time.perf_counter()
+        try:
+            self.builder.build()
+        except Exception:
+            traceback.print_exc()
+            print("❌ Rebuild failed, keeping the previous output")
+            return
+        print(f"🔄 Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms, reloading browsers")
+        self.livereload.notify()
+
+    def run(self):
+        previous = self.snapshot()
+        while True:
+            time.sleep(self.interval)
+            current = self.snapshot()
+            if current != previous:
+                changed = sorted(set(current.items()) ^ set(previous.items()))
+                print(f"✏️  {changed[0][0]} changed")
+                previous = current
+                # Edits made while the build runs show up in the next snapshot
+                self.rebuild()
+
+
+class LiveReloadHandler(CachingHandler):
+    """Serves the site, injecting the live-reload client into HTML pages"""
+
+    livereload = None
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self.stream_reloads()
+            return
+        super().do_GET()
+
+    def rewrites(self, path):
+        return path.endswith(".html")
+
+    def rewrite(self, path, data):
+        marker = data.rfind(b"</body>")
+        if marker == -1:
+            marker = len(data)
+        return data[:marker] + LIVERELOAD_SCRIPT + data[marker:]
+
+    def stream_reloads(self):
+        """Hold a server-sent events stream open, sending one event per rebuild"""
+        # The stream has no length, so it ends the keep-alive connection
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        generation = self.livereload.generation
+        try:
+            while True:
+                latest = self.livereload.wait(generation, timeout=15)
+                if latest != generation:
+                    generation = latest
+                    self.wfile.write(b"event: reload\ndata: {}\n\n")
+                else:
+                    # Keep-alive comment; fails once the browser has gone
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def serve_site(port=8000, watch=False, open_browser=True):
     """Serve the static site on localhost"""
 
     # Change to the docs directory
     os.chdir(Path(__file__).parent)
 
     # Create server
-    handler = http.server.SimpleHTTPRequestHandler
+    if watch:
+        from sitegen.builder import StaticSiteBuilder
+
+        builder = StaticSiteBuilder(incremental=True)
+        builder.build()
+        livereload = LiveReload()
+        handler = type("Handler", (LiveReloadHandler,), {"livereload": livereload})
+        SiteWatcher(builder, livereload).start()
+    else:
+        handler = CachingHandler
 
-    with socketserver.TCPServer(("", port), handler) as httpd:
+    with SiteServer(("", port), handler) as httpd:
         print(f"🌐 Serving static site at http://localhost:{port}")
         print(f"📁 Serving files from: {os.getcwd()}")
+        if watch:
+            print("👀 Watching content, template, and assets for changes")
         print("🔄 Press Ctrl+C to stop the server")
-        print("🌍 Opening browser...")
 
         # Open browser automatically
-        webbrowser.open(f"http://localhost:{port}")
+        if open_browser:
+            print("🌍 Opening browser...")
+            import webbrowser
+            webbrowser.open(f"http://localhost:{port}")
 
         try:
             httpd.serve_forever()
@@ -33,4 +431,10 @@ def serve_site(port=8000):
             print("\n👋 Server stopped")
 
 if __name__ == "__main__":
-    serve_site()
+    parser = argparse.ArgumentParser(description="Serve the static site locally")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--watch", action="store_true",
+                        help="rebuild on changes and live-reload open pages")
+    parser.add_argument("--no-browser", action="store_true", help="don't open a browser")
+    args = parser.parse_args()
+    serve_site(args.port, watch=args.watch, open_browser=not args.no_browser)
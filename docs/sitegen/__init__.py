@@ -0,0 +1,5 @@
+"""
+Helpers for the redshiftzero.github.io static site builder.
+The entry point is StaticSiteBuilder in sitegen.builder; build.py is its
+command line.
+"""
@@ -0,0 +1,158 @@
+"""
+Incremental copying of static assets into the output directory.
+Files are compared by size and mtime (and optionally content hash) and only
+changed files are copied, using the kernel's zero-copy paths where the
+platform has them. Files that no longer exist in the source are removed.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+
+class SyncStats:
+    """Counts of what an asset sync did"""
+
+    __slots__ = ('copied', 'unchanged', 'removed', 'bytes_copied')
+
+    def __init__(self):
+        self.copied = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.bytes_copied = 0
+
+    def summary(self):
+        return (f"{self.copied} copied ({self.bytes_copied / 1024:.0f} KB), "
+                f"{self.unchanged} unchanged, {self.removed} removed")
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def _zero_copy(src_fd, dst_fd, size):
+    """Copy size bytes between file descriptors without a userspace buffer
+
+    Returns False if the platform supports neither copy_file_range nor
+    sendfile between regular files.
+    """
+    for copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+        if copy is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if copy is os.sendfile:
+                    sent = copy(dst_fd, src_fd, offset, size - offset)
+                else:
+                    sent = copy(src_fd, dst_fd, size - offset, offset, offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+            os.ftruncate(dst_fd, 0)
+            continue
+        if offset == size:
+            return True
+    return False
+
+
+def copy_file(src, dst):
+    """Copy a file and its metadata, replacing dst atomically"""
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    size = os.stat(src).st_size
+    with open(src, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+        if not _zero_copy(fsrc.fileno(), fdst.fileno(), size):
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, tmp_path)
+    os.replace(tmp_path, dst)
+    return size
+
+
+def needs_copy(src, dst, check_hash=False):
+    """True if dst is missing or differs from src"""
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src)
+    if src_stat.st_size != dst_stat.st_size:
+        return True
+    if check_hash:
+        return _file_hash(src) != _file_hash(dst)
+    # copystat() carries the mtime over, so equal mtimes mean an earlier sync
+    return src_stat.st_mtime_ns != dst_stat.st_mtime_ns
+
+
+def sync_file(src, dst, stats, check_hash=False):
+    """Copy a single file if it changed; returns True if it was copied"""
+    if not needs_copy(src, dst, check_hash):
+        stats.unchanged += 1
+        return False
+    stats.bytes_copied += copy_file(src, dst)
+    stats.copied += 1
+    return True
+
+
+def _walk_files(root):
+    """Yield paths of every file under root, relative to root"""
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                else:
+                    yield rel_path
+
+
+def sync_tree(src_dir, dst_dir, stats, keep=(), check_hash=False):
+    """Make dst_dir mirror src_dir, copying only changed files
+
+    Files in dst_dir that are not in src_dir are removed unless their path
+    relative to dst_dir is in keep; those are files the builder generates
+    into an asset directory. Returns True if anything changed.
+    """
+    src_dir = Path(src_dir)
+    dst_dir = Path(dst_dir)
+    changed = False
+
+    source_files = set()
+    for rel_path in _walk_files(src_dir):
+        source_files.add(rel_path)
+        if sync_file(src_dir / rel_path, dst_dir / rel_path, stats, check_hash):
+            changed = True
+
+    if not dst_dir.exists():
+        return changed
+
+    keep = {os.path.normpath(path) for path in keep}
+    removed_dirs = set()
+    for rel_path in list(_walk_files(dst_dir)):
+        if rel_path in source_files or rel_path in keep:
+            continue
+        os.unlink(dst_dir / rel_path)
+        removed_dirs.add(os.path.dirname(rel_path))
+        stats.removed += 1
+        changed = True
+
+    # Drop directories the removals left empty, deepest first
+    for rel_dir in sorted(removed_dirs, key=len, reverse=True):
+        while rel_dir:
+            try:
+                os.rmdir(dst_dir / rel_dir)
+            except OSError:
+                break
+            rel_dir = os.path.dirname(rel_dir)
+
+    return changed
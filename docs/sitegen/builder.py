@@ -0,0 +1,1369 @@
+"""
+The static site builder: converts Markdown posts to HTML and builds the
+static site structure. build.py is its command line; the build daemon in
+sitegen.daemon keeps builders from this module warm.
+"""
+
+import html
+import json
+import os
+import re
+import time
+from collections import deque
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Markdown, Pygments, Pillow, compression, and process pools are imported by
+# the stages that use them, so a build with nothing to do never loads them
+from sitegen.assets import SyncStats, sync_file, sync_tree
+from sitegen.feeds import (FEED_ENTRIES, FEED_OUTPUTS, ContentDates, FeedEntry, FragmentCache,
+                           absolute_url, absolutize, as_datetime, atom_chunks, json_feed_chunks, rss_chunks,
+                           sitemap_chunks, sitemap_files, sitemap_index_chunks)
+from sitegen.fingerprint import SKIP_SUFFIXES, AssetFingerprinter
+from sitegen.frontmatter import parse_post
+from sitegen.graph import DependencyGraph
+from sitegen.icons import IconSprite
+from sitegen.manifest import BuildManifest, PostRecord, decode_record, encode_record, hash_file, hash_json
+from sitegen.minify import BudgetReport, minify_css, minify_html
+from sitegen.output import OutputWriter, walk_outputs
+from sitegen.profile import NULL_TIMER, BuildProfiler, NullProfiler, PhaseTimer
+from sitegen.preprocess import preprocess, substitute_reference_links, substitute_reference_text
+from sitegen.render import ENGINE_CONFIGS, renderer
+from sitegen.search import SearchIndex, post_terms
+from sitegen.template import Template
+
+class BudgetExceeded(Exception):
+    """Raised when pages exceed the HTML byte budget in strict mode"""
+
+
+class StaticSiteBuilder:
+    # Static assets copied from the current Hugo site, as (source, output) paths
+    ASSETS = [
+        ("../css", "css"),
+        ("../js", "js"),
+        ("../img", "img"),
+        ("../fonts", "fonts"),
+        ("../icons", "icons"),
+        ("../favicon.ico", "favicon.ico"),
+        ("../manifest.json", "manifest.json"),
+        ("../robots.txt", "robots.txt")
+    ]
+
+    # Stylesheets that get a minified .min.css copy when minifying
+    MINIFY_CSS = ["css/main.css", "css/modern.css", "css/pygments.css"]
+
+    # Files in the output directory that belong to the builder, not the site
+    NON_OUTPUTS = ["base-template.html", "sitegen", "benchmarks", "__pycache__"]
+
+    # Posts each render worker may have queued or finished but not yet written
+    RENDER_WINDOW = 4
+
+    # Above this many pages, pagination shows the first and last pages and
+    # this many on either side of the current one, not every page
+    PAGINATION_LIMIT = 15
+    PAGINATION_NEIGHBOURS = 5
+
+    # Posts on each page of the main index
+    POSTS_PER_PAGE = 5
+
+    def __init__(self, source_dir="../content", output_dir=".", cache_dir=None, incremental=False,
+                 jobs=1, highlight_cache_size=32 * 1024 * 1024, compat_links="copy",
+                 hash_assets=False, profile=False, compress=False, minify=False,
+                 html_budget=None, strict_budget=False, responsive_images=False, fingerprint=False,
+                 search=False, explain=False, feeds=True, feed_content="full"):
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.output_dir / ".build-cache"
+        self.incremental = incremental
+        self.jobs = jobs or os.cpu_count() or 1
+        self.highlight_cache_size = highlight_cache_size
+        self.compat_links = compat_links
+        self.hash_assets = hash_assets
+        self.profile = profile
+        self.compress = compress
+        self.minify = minify
+        self.html_budget = html_budget
+        self.strict_budget = strict_budget
+        self.css_replacements = {}
+        self.responsive_images = responsive_images
+        self.images = None
+        self.image_digest = None
+        self.fingerprint = fingerprint
+        self.search = search
+        self.search_index = None
+        self.explain = explain
+        self.graph = None
+        self.feeds = feeds
+        self.feed_content = feed_content
+        self.content_dates = None
+        self.fragments = FragmentCache(self.cache_dir / "feed")
+        self.build_time = None
+        self.shared_inputs = {}
+        self.fingerprints = None
+        self.asset_digest = None
+        self.profiler = NullProfiler()
+        self.writer = OutputWriter(compat_links)
+        self.icon_sprite = IconSprite()
+        self.posts = []
+        self.manifest = None
+        # State kept between builds by a long-lived builder, as in the build
+        # daemon or serve.py --watch: the manifest this builder last saved,
+        # source hashes by path and stat, decoded post records, and the
+        # compiled template
+        self.warm_manifest = None
+        self.source_hashes = {}
+        self.records = {}
+        self._template = None
+        self._template_fingerprint = None
+
+    def build(self):
+        """Build the complete static site"""
+        print("Building static site...")
+        self.posts = []
+        self.images = None
+        self.image_digest = None
+        self.fingerprints = None
+        self.asset_digest = None
+        self.writer = OutputWriter(self.compat_links)
+        self.build_time = datetime.now(timezone.utc).replace(microsecond=0)
+
+        if self.profile:
+            self.profiler = BuildProfiler(self.cache_dir / "profile.json")
+            with self.profiler:
+                self.run_stages()
+            self.profiler.report()
+        else:
+            self.profiler = NullProfiler()
+            self.run_stages()
+
+        print("Static site built successfully!")
+
+    def run_stages(self):
+        """Run each build stage in order"""
+        # Load the previous build's manifest; a full build starts from scratch
+        # but still records a manifest for the next incremental build
+        manifest_path = self.cache_dir / "manifest.json"
+        warm_manifest, self.warm_manifest = self.warm_manifest, None
+        # The manifest this builder saved last time is still current
+        # unless another process has written the file since
+        if warm_manifest is not None and warm_manifest.unchanged_on_disk():
+            previous = warm_manifest
+        else:
+            previous = BuildManifest.load(manifest_path)
+        # Whatever this build trusts of the last one, the outputs it wrote
+        # are kept so the ones nothing produces any more can be removed
+        previous_outputs = set(previous.graph_edges())
+        self.manifest = previous if self.incremental else BuildManifest(manifest_path)
+
+        if self.manifest.invalidate_if_changed(self.config_fingerprint()):
+            if self.incremental:
+                print("  Builder code or config changed, rebuilding everything")
+        self.graph = DependencyGraph(self.output_dir, self.manifest.graph_edges(), previous_outputs)
+
+        # Copy static assets
+        with self.profiler.stage("copy_assets"):
+            self.copy_assets()
+
+        # Icons every page draws, in one sprite pages link to
+        self.write_icon_sprite()
+
+        # Generate Pygments CSS if available
+        with self.profiler.stage("generate_pygments_css"):
+            self.generate_pygments_css()
+
+        # Minify stylesheets before any page links to them
+        if self.minify:
+            with self.profiler.stage("minify_css"):
+                self.minify_stylesheets()
+
+        if self.responsive_images:
+            with self.profiler.stage("process_images"):
+                self.process_images()
+
+        # Fingerprint assets last, once every stylesheet is final
+        if self.fingerprint:
+            with self.profiler.stage("fingerprint_assets"):
+                self.fingerprint_assets()
+
+        # Inputs of every page: the template, the social links in its
+        # header, and the image and fingerprinted asset URLs pages embed
+        template_fingerprint = self.template_fingerprint()
+        if template_fingerprint != self._template_fingerprint:
+            self._template = None
+            self._template_fingerprint = template_fingerprint
+        self.shared_inputs = {
+            'template': template_fingerprint,
+            'socials': self.socials_fingerprint(),
+            'assets': hash_json([self.image_digest, self.asset_digest]),
+            'icons': self.icon_sprite.url,
+        }
+
+        # Post terms for the search index are cached alongside the manifest
+        if self.search:
+            self.search_index = SearchIndex.load(self.cache_dir / "search.json")
+
+        # Post modification dates for the feeds are also kept between builds
+        if self.feeds:
+            self.content_dates = ContentDates(self.cache_dir / "lastmod.json")
+
+        # Convert posts, reusing highlighted code blocks from earlier builds
+        with self.profiler.stage("convert_posts"):
+            highlight_cache = self.use_highlight_cache()
+            self.convert_posts()
+
+        # Generate index pages
+        with self.profiler.stage("generate_index_pages"):
+            self.generate_index_pages()
+
+        if self.feeds:
+            with self.profiler.stage("generate_feeds"):
+                self.generate_feeds()
+
+        if self.search:
+            with self.profiler.stage("generate_search_index"):
+                self.generate_search_index()
+
+        # Stale pages go before the budget check and compression see them
+        self.remove_stale_outputs()
+
+        if self.html_budget:
+            with self.profiler.stage("check_budget"):
+                self.check_html_budget()
+
+        # Write .gz/.br siblings for hosts that serve them directly
+        if self.compress:
+            with self.profiler.stage("compress_outputs"):
+                self.compress_outputs()
+
+        self.manifest.record_graph(self.graph.edges)
+        self.manifest.save()
+        self.warm_manifest = self.manifest
+        evicted = highlight_cache.evict()
+        if evicted:
+            print(f"  Evicted {evicted} old entries from the highlight cache")
+
+        print(f"  Outputs: {self.writer.summary()}")
+        if self.explain:
+            print("Dependency graph:")
+            for line in self.graph.explain():
+                print(f"  {line}")
+
+    def use_highlight_cache(self):
+        """Point this process's Markdown engines at the highlight cache"""
+        return renderer.use_highlight_cache(self.cache_dir / "highlight", self.highlight_cache_size)
+
+    def config_fingerprint(self):
+        """Hash of the builder's own code and settings"""
+        return hash_json({
+            'source_dir': str(self.source_dir),
+            'output_dir': str(self.output_dir),
+            'compat_links': self.compat_links,
+            'minify': self.minify,
+            'code': code_fingerprint(),
+        })
+
+    def source_hash(self, path):
+        """Hash of a source file, reused while its mtime and size are unchanged"""
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self.source_hashes.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = hash_file(path)
+        self.source_hashes[path] = (key, digest)
+        return digest
+
+    @property
+    def template_path(self):
+        return self.output_dir / "base-template.html"
+
+    def base_template(self):
+        """Return the compiled base-template.html, or None if it is missing
+
+        The template is read and split into chunks once, and again only
+        when its contents change.
+        """
+        if self._template is None and self.template_path.exists():
+            self._template = Template.load(self.template_path).partial(ICON_SPRITE=self.icon_sprite.url)
+        return self._template
+
+    def template_fingerprint(self):
+        """Hash of base-template.html, or None if it is missing"""
+        if not self.template_path.exists():
+            return None
+        return self.source_hash(self.template_path)
+
+    def socials_fingerprint(self):
+        """Hash of socials.toml, or None if it is missing"""
+        socials_path = self.source_dir / "socials.toml"
+        if not socials_path.exists():
+            return None
+        return self.source_hash(socials_path)
+
+    def plan_outputs(self, outputs, inputs):
+        """Record outputs' inputs in the dependency graph; True if they need rebuilding"""
+        reason = self.graph.check(outputs, inputs) if self.incremental else "full build"
+        self.graph.record(outputs, inputs, reason)
+        return reason is not None
+
+    def remove_stale_outputs(self):
+        """Delete pages the previous build wrote that nothing produces any more"""
+        for output in self.graph.removed():
+            output_path = self.output_dir / output
+            if output_path.exists():
+                print(f"  Removing stale {output}")
+                output_path.unlink()
+                # And any pre-compressed copies an earlier --compress build left
+                for suffix in SKIP_SUFFIXES:
+                    output_path.with_name(output_path.name + suffix).unlink(missing_ok=True)
+                # Drop the page's directory too if nothing else is in it
+                if output_path.parent != self.output_dir:
+                    try:
+                        output_path.parent.rmdir()
+                    except OSError:
+                        pass
+
+    def copy_assets(self):
+        """Copy CSS, JS, images, and other static assets"""
+        print("Copying static assets...")
+
+        # Only changed files are copied; files the builder generates into
+        # an asset directory must survive the removal of orphans
+        stats = SyncStats()
+        generated = self.generated_assets()
+        for src, dst in self.ASSETS:
+            src_path = Path(src)
+            dst_path = self.output_dir / dst
+
+            if src_path.exists():
+                if src_path.is_file():
+                    changed = sync_file(src_path, dst_path, stats, self.hash_assets)
+                else:
+                    keep = [path[len(dst) + 1:] for path in generated if path.startswith(dst + "/")]
+                    changed = sync_tree(src_path, dst_path, stats, keep, self.hash_assets)
+                if changed:
+                    print(f"  Copied {src} -> {dst}")
+
+        print(f"  Assets: {stats.summary()}")
+
+    def generated_assets(self):
+        """Paths, relative to the output directory, the builder writes into asset directories"""
+        generated = ["css/pygments.css", self.icon_sprite.path]
+        if self.minify:
+            generated += [self.minified_name(path) for path in self.MINIFY_CSS]
+        if self.fingerprint:
+            # Hashed copies from the last build; fingerprinting prunes old ones
+            try:
+                generated += json.loads((self.output_dir / "asset-manifest.json").read_text()).values()
+            except (OSError, ValueError):
+                pass
+        return generated
+
+    def write_icon_sprite(self):
+        """Write the shared icon sprite and remove outdated ones"""
+        removed = self.icon_sprite.write(self.output_dir, self.writer)
+        if removed:
+            print(f"  Removed {removed} outdated icon sprite(s)")
+
+    @staticmethod
+    def minified_name(path):
+        return re.sub(r"\.css$", ".min.css", path)
+
+    def minify_stylesheets(self):
+        """Write a .min.css copy of each stylesheet and link pages to it
+
+        The stylesheets in the output directory double as the sources when
+        there is no Hugo asset directory, so they are never minified in place.
+        """
+        print("Minifying stylesheets...")
+        self.css_replacements = {}
+        for path in self.MINIFY_CSS:
+            source = self.output_dir / path
+            if not source.exists():
+                continue
+            css = source.read_text(encoding='utf-8')
+            minified = minify_css(css)
+            self.writer.write_text(self.output_dir / self.minified_name(path), minified)
+            self.css_replacements[f"/{path}"] = f"/{self.minified_name(path)}"
+            print(f"  {path}: {len(css.encode('utf-8')) / 1024:.1f} KB -> "
+                  f"{len(minified.encode('utf-8')) / 1024:.1f} KB")
+
+    def process_images(self):
+        """Generate responsive variants of the images in img/"""
+        print("Processing images...")
+        from sitegen.images import ImagePipeline, available_formats
+        if not available_formats():
+            print("  Warning: Pillow with WebP or AVIF support is not installed, images left as they are")
+            print("  Install with: pip install pillow")
+            return
+        self.images = ImagePipeline(self.output_dir, self.cache_dir)
+        self.image_digest = self.images.build()
+        print(f"  {self.images.summary()}")
+
+    def fingerprint_assets(self):
+        """Write content-hashed copies of assets, asset-manifest.json, and _headers"""
+        print("Fingerprinting assets...")
+        directories = [dst for src, dst in self.ASSETS if not Path(dst).suffix]
+        immutable = [self.icon_sprite.url]
+        if self.images is not None:
+            from sitegen.images import VARIANT_DIR
+            immutable.append(f"/{VARIANT_DIR}/*")
+        self.fingerprints = AssetFingerprinter(self.output_dir, directories, immutable)
+        self.asset_digest = self.fingerprints.build()
+        print(f"  {self.fingerprints.summary()}")
+
+    def finish_html(self, html):
+        """Apply output-wide HTML rewrites: responsive images, minification, fingerprints"""
+        if self.images is not None:
+            html = self.images.rewrite(html)
+        if self.minify:
+            html = minify_html(html, self.css_replacements)
+        if self.fingerprints is not None:
+            html = self.fingerprints.rewrite_html(html)
+        return html
+
+    def write_html(self, path, html):
+        """Write an HTML page"""
+        return self.writer.write_text(path, self.finish_html(html))
+
+    def write_html_chunks(self, path, chunks):
+        """Write an HTML page given as an iterable of text chunks
+
+        Without output-wide rewrites the chunks go straight to disk. The
+        rewrites work on whole documents (template slots sit inside tags and
+        attributes), so with any of them enabled the page is joined first.
+        """
+        if self.images is None and not self.minify and self.fingerprints is None:
+            return self.writer.write_chunks(path, chunks)
+        return self.write_html(path, "".join(chunks))
+
+    def check_html_budget(self):
+        """Report pages larger than the HTML byte budget, failing if strict"""
+        print("Checking page sizes...")
+        report = BudgetReport(self.html_budget)
+        # Each post's Hugo-path copy or link is the same page over again
+        compat = {self.compat_output(post['slug']) for post in self.posts}
+        for dirpath, name in walk_outputs(self.output_dir, exclude=self.NON_OUTPUTS):
+            if name.endswith(".html"):
+                path = Path(dirpath) / name
+                output = path.relative_to(self.output_dir).as_posix()
+                if output not in compat:
+                    report.check(output, path.stat().st_size)
+        for line in report.summary():
+            print(f"  {line}")
+        if report.over and self.strict_budget:
+            raise BudgetExceeded(f"{len(report.over)} page(s) exceed the {self.html_budget} byte budget")
+
+    def generate_pygments_css(self):
+        """Generate Pygments CSS for syntax highlighting"""
+        if self.incremental and self.manifest.fresh_page("pygments", "default", self.output_dir):
+            return
+
+        try:
+            from pygments.formatters import HtmlFormatter
+            from pygments.styles import get_style_by_name
+            
+            # Use a light theme that matches the site
+            formatter = HtmlFormatter(style='default', noclasses=False, cssclass='highlight')
+            css = formatter.get_style_defs('.highlight')
+            
+            # Save to css directory
+            css_path = self.output_dir / "css" / "pygments.css"
+            self.writer.write_text(css_path, css)
+            self.manifest.record_page("pygments", "default", ["css/pygments.css"])
+            print("  Generated Pygments CSS")
+        except ImportError:
+            print("  Warning: Pygments not installed, syntax highlighting disabled")
+            print("  Install with: pip install pygments")
+
+    def convert_posts(self):
+        """Convert Markdown posts to HTML"""
+        print("Converting posts...")
+
+        posts_dir = self.source_dir / "post"
+        if not posts_dir.exists():
+            print(f"Posts directory not found: {posts_dir}")
+            return
+
+        # Work out which posts need converting, keeping glob order so that
+        # self.posts (and the index built from it) matches a serial build
+        sources = []
+        pending = []
+        reasons = {}
+        seen = set()
+        skipped = 0
+        for md_file in posts_dir.glob("*.md"):
+            key = md_file.name
+            seen.add(key)
+            source_hash = self.source_hash(md_file)
+
+            inputs = self.post_inputs(key, source_hash)
+            reason = "full build"
+            if self.incremental:
+                entry = self.manifest.post_entry(key)
+                if entry is None:
+                    reason = "new source"
+                elif entry['hash'] != source_hash:
+                    reason = f"changed: post:{key}"
+                else:
+                    reason = self.graph.check(entry['outputs'], inputs)
+                # Posts missing from the search or feed caches are rendered
+                # again to fill them in
+                if reason is None and self.search and entry['record'] is not None:
+                    if not self.search_index.has(key, source_hash):
+                        reason = "not in the search index"
+                if reason is None and self.full_feeds() and entry['record'] is not None:
+                    if not self.fragments.has(entry['record']['slug']):
+                        reason = "not in the feed cache"
+                if reason is None:
+                    self.graph.record(entry['outputs'], inputs, None)
+                    record = self.post_record(key, source_hash, entry['record'])
+                    sources.append((key, md_file, source_hash, record))
+                    skipped += 1
+                    continue
+
+            sources.append((key, md_file, source_hash, None))
+            pending.append(md_file)
+            reasons[key] = reason
+
+        # Rendered posts are written as they arrive, so only a bounded
+        # number of pages is ever held in memory
+        stats_before = renderer.stats.copy()
+        rendered = self.render_posts(pending)
+        pending_files = set(pending)
+
+        for key, md_file, source_hash, record in sources:
+            if md_file in pending_files:
+                print(f"  Converting {md_file.name}")
+                result, timer, pid = next(rendered)
+                if result is None:
+                    print(f"  Skipping draft: {md_file.name}")
+                    record = None
+                    if self.search:
+                        self.search_index.forget(key)
+                else:
+                    record, post_html, body_html, terms = result
+                    self.records[key] = (source_hash, record)
+                    timer.last = time.perf_counter()
+                    self.write_post(record['slug'], post_html)
+                    if body_html is not None:
+                        self.fragments.write(record['slug'], body_html)
+                    timer.mark("write")
+                    if self.search:
+                        self.search_index.update(key, source_hash, record['slug'], terms)
+                self.profiler.add_post(md_file.name, timer.phases, pid)
+                outputs = self.post_outputs(record['slug']) if record is not None else []
+                self.manifest.record_post(key, source_hash, record, outputs)
+                self.graph.record(outputs, self.post_inputs(key, source_hash), reasons[key])
+
+            if record is not None:
+                self.posts.append(record)
+                if self.feeds:
+                    self.content_dates.touch(record['slug'], source_hash, record['date'], self.build_time)
+
+        if skipped:
+            print(f"  Skipped {skipped} unchanged posts")
+        if pending:
+            stats = renderer.stats.since(stats_before)
+            print(f"  Markdown: {stats.summary()}")
+            print(f"  Code blocks: {stats.highlight_summary()}")
+
+        self.prune_removed_posts(seen)
+        if self.search:
+            for key in set(self.search_index.entries) - seen:
+                self.search_index.forget(key)
+
+    def post_record(self, key, source_hash, encoded):
+        """A post's index record from the manifest, decoded once per source hash"""
+        if encoded is None:
+            return None
+        cached = self.records.get(key)
+        if cached is not None and cached[0] == source_hash:
+            return cached[1]
+        record = decode_record(encoded)
+        self.records[key] = (source_hash, record)
+        return record
+
+    def post_inputs(self, key, source_hash):
+        """Dependency graph inputs of a post's pages"""
+        return {f"post:{key}": source_hash, **self.shared_inputs}
+
+    def post_outputs(self, slug):
+        """Output paths, relative to the output directory, written for a post"""
+        return [f"posts/{slug}.html", self.compat_output(slug)]
+
+    @staticmethod
+    def compat_output(slug):
+        """The old Hugo path of a post, a copy or link of posts/<slug>.html"""
+        return f"post/{slug}/index.html"
+
+    def prune_removed_posts(self, seen):
+        """Forget posts whose source file has been removed
+
+        Their outputs are no longer in the dependency graph, so
+        remove_stale_outputs() deletes them.
+        """
+        for key in self.manifest.post_keys():
+            if key not in seen:
+                print(f"  Forgetting deleted post {key}")
+                self.manifest.forget_post(key)
+                self.records.pop(key, None)
+                self.source_hashes.pop(self.source_dir / "post" / key, None)
+
+    def render_posts(self, md_files):
+        """Render posts, across a process pool when jobs > 1
+
+        Yields (result, timer, pid) for each post, in the same order as
+        md_files, where result is what render_post() returned. The pool is
+        kept at most RENDER_WINDOW posts per worker ahead of the consumer,
+        so finished pages don't pile up in memory.
+        """
+        if self.jobs <= 1 or len(md_files) <= 1:
+            for md_file in md_files:
+                timer = PhaseTimer()
+                yield self.render_post(md_file, timer), timer, os.getpid()
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(self.jobs, len(md_files))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                 initargs=(self.source_dir, self.output_dir, self.cache_dir,
+                                           self.highlight_cache_size, self.search,
+                                           self.feeds, self.feed_content)) as pool:
+            files = iter(md_files)
+            in_flight = deque()
+            for md_file in files:
+                in_flight.append(pool.submit(_render_post_in_worker, md_file))
+                if len(in_flight) >= workers * self.RENDER_WINDOW:
+                    break
+            while in_flight:
+                result, timer, pid, stats = in_flight.popleft().result()
+                for md_file in files:
+                    in_flight.append(pool.submit(_render_post_in_worker, md_file))
+                    break
+                # Fold each worker's engine timings into this process's totals
+                renderer.stats.add(stats)
+                yield result, timer, pid
+
+    def render_post(self, md_file, timer=NULL_TIMER):
+        """Render a Markdown post without writing anything
+
+        Returns (record, post_html, body_html, search_terms), or None if the
+        post is a draft. body_html, the rendered Markdown alone, is None
+        unless building full-content feeds, and search_terms is None unless
+        building a search index.
+        Phase timings are recorded on timer.
+        """
+        # Parse frontmatter and content
+        with open(md_file, 'r', encoding='utf-8') as f:
+            file_content = f.read()
+        timer.mark("read")
+
+        meta, body = parse_post(file_content, md_file.stem, source=md_file.name)
+        timer.mark("frontmatter")
+
+        # Check if post is a draft - skip if it is
+        if meta.draft:
+            return None
+
+        title = meta.title
+        date = meta.date
+        slug = meta.slug
+
+        # Clean up the content - remove any remaining frontmatter artifacts
+        content = body.strip()
+
+        # Remove any remaining frontmatter markers that might have been missed
+        content = re.sub(r'^\+\+\+.*?\+\+\+\s*', '', content, flags=re.DOTALL)
+        content = re.sub(r'^---.*?---\s*', '', content, flags=re.DOTALL)
+
+        # Pull out reference links and tidy blank lines in one pass
+        content, ref_links = preprocess(content)
+        timer.mark("preprocess")
+
+        # Convert Markdown to HTML with the shared post engine, which also
+        # summarises the document and counts its words from the same tree
+        highlight_time = renderer.stats.highlight_time
+        html_content = renderer.convert('post', content)
+        summary, word_count = renderer.document_summary('post')
+
+        # Replace reference link placeholders with actual links
+        html_content = substitute_reference_links(html_content, ref_links)
+        summary = substitute_reference_text(summary, ref_links)
+        timer.split("markdown", "highlight", renderer.stats.highlight_time - highlight_time)
+
+        # Store post info for index generation
+        record = PostRecord(title, date, slug, summary, word_count)
+
+        # Create post HTML
+        post_html = self.create_post_html(title, date, html_content, slug, record.reading_time, word_count)
+        terms = post_terms(title, record['summary'], html_content) if self.search else None
+        timer.mark("template")
+        body_html = html_content if self.full_feeds() else None
+        return record, post_html, body_html, terms
+
+    def write_post(self, slug, post_html):
+        """Write a rendered post to its output paths"""
+        # Save to output directory - create both URL structures for compatibility
+        # New structure: /posts/slug.html
+        output_path = self.output_dir / "posts" / f"{slug}.html"
+
+        # Old Hugo structure: /post/slug/index.html
+        hugo_output_path = self.output_dir / self.compat_output(slug)
+
+        # Encode once; the Hugo path is a copy or link of the new one
+        data = self.finish_html(post_html).encode('utf-8')
+        self.writer.write_bytes(output_path, data)
+        self.writer.write_compat(output_path, hugo_output_path, data)
+
+    def format_date(self, date):
+        """Safely format a date object to string"""
+        try:
+            if hasattr(date, 'strftime'):
+                return date.strftime('%Y.%m.%d')
+            elif isinstance(date, str):
+                return date
+            else:
+                return str(date)
+        except:
+            return str(date)
+
+    def reading_time_html(self, minutes, word_count):
+        """Post meta item showing a post's reading time"""
+        return (f'<span class="post-meta-item reading-time" title="{word_count:,} words">'
+                f'{minutes} min read</span>')
+
+    def create_post_html(self, title, date, content, slug, reading_time=1, word_count=0):
+        """Create HTML for a single post"""
+        # Use the base template and fill its placeholders
+        template = self.base_template()
+        if template is not None:
+            # Handle date formatting safely
+            if hasattr(date, 'isoformat'):
+                date_iso = date.isoformat()
+            elif isinstance(date, str):
+                date_iso = date
+            else:
+                date_iso = datetime.now().isoformat()
+
+            # Fill placeholders
+            html = template.render(
+                PAGE_TITLE=f"{title} | redshiftzero",
+                PAGE_DESCRIPTION=title,
+                CANONICAL_URL=f"https://www.redshiftzero.com/post/{slug}/",
+                OG_TYPE="article",
+                TWITTER_CARD="summary",
+                SCHEMA_TYPE="Article",
+                PUBLISH_DATE=date_iso,
+                MODIFIED_DATE=date_iso,
+                MAIN_CONTENT=f"""
+                <article class="content post h-entry">
+                    <h1 class="post-title p-name">{title}</h1>
+
+                    <div class="post-meta">
+                        <time datetime="{date_iso}" class="post-meta-item published dt-published">
+                            {self.icon_sprite.icon('calendar', 'icon post-meta-icon')} {self.format_date(date)}
+                        </time>
+                        {self.reading_time_html(reading_time, word_count)}
+                    </div>
+
+                    <div class="post-body e-content">
+                        {content}
+                    </div>
+                </article>
+            """,
+            )
+
+            return html
+        else:
+            # Fallback to simple template if base-template.html doesn't exist
+            return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} | redshiftzero</title>
+    <link rel="stylesheet" href="/css/meme.min.0c24096f9051894f1547a4f579eebdb58f9b546189c9b7bfe789edf9d4be9a9a.css">
+</head>
+<body>
+    <div class="container">
+        <header class="header">
+            <div class="site-brand">
+                <a href="/" class="brand">redshiftzero</a>
+            </div>
+        </header>
+
+        <main class="main">
+            <article class="content post">
+                <h1 class="post-title">{title}</h1>
+                <div class="post-meta">
+                    <time datetime="{date.isoformat()}">{date.strftime('%Y.%m.%d')}</time>
+                </div>
+                <div class="post-body">
+                    {content}
+                </div>
+            </article>
+        </main>
+
+        <footer class="footer">
+            <div class="site-info">© 1969–2025 redshiftzero</div>
+        </footer>
+    </div>
+</body>
+</html>"""
+
+    def compress_outputs(self):
+        """Pre-compress HTML, CSS, JS, SVG, JSON, and XML outputs"""
+        print("Compressing outputs...")
+        from sitegen.compress import available_formats, compress_tree
+        if "brotli" not in available_formats():
+            print("  brotli is not installed, writing .gz siblings only")
+        stats = compress_tree(self.output_dir, exclude=self.NON_OUTPUTS)
+        for line in stats.summary():
+            print(f"  {line}")
+
+    def generate_index_pages(self):
+        """Generate index pages for categories and tags"""
+        print("Generating index pages...")
+
+        # Sort posts by date
+        self.posts.sort(key=lambda x: x['date'], reverse=True)
+
+        # Generate main index; only pages whose posts changed are rewritten
+        self.generate_main_index()
+
+        # The archive only lists titles and dates, so body-only edits
+        # leave it alone
+        archive_inputs = {
+            f"listing:{post['slug']}": hash_json([post['title'], encode_record(post)['date']])
+            for post in self.posts
+        }
+        archive_inputs["archive:order"] = hash_json([post['slug'] for post in self.posts])
+        if self.plan_outputs(["archive/index.html"], {**archive_inputs, **self.shared_inputs}):
+            self.generate_archive_page()
+        else:
+            print("  Skipping unchanged archive page")
+
+        about_md_path = Path("../content/about/index.md")
+        about_key = self.source_hash(about_md_path) if about_md_path.exists() else None
+        if self.plan_outputs(["about/index.html"], {"about": about_key, **self.shared_inputs}):
+            self.generate_about_page()
+        else:
+            print("  Skipping unchanged about page")
+
+    def index_page_inputs(self, page_posts, total_pages):
+        """Dependency graph inputs of one page of the main index
+
+        A page shows every field of its own posts, in order, and links to
+        every other page.
+        """
+        inputs = {f"record:{post['slug']}": hash_json(encode_record(post)) for post in page_posts}
+        inputs["index:order"] = hash_json([post['slug'] for post in page_posts])
+        inputs["index:pages"] = total_pages
+        return {**inputs, **self.shared_inputs}
+
+    def generate_main_index(self):
+        """Generate the main index page with pagination"""
+        print("  Generating main index with pagination...")
+
+        # Sort posts by date (newest first)
+        self.posts.sort(key=lambda x: x['date'], reverse=True)
+
+        # Create pagination
+        posts_per_page = self.POSTS_PER_PAGE
+        total_posts = len(self.posts)
+        total_pages = (total_posts + posts_per_page - 1) // posts_per_page
+
+        # Generate each page
+        skipped = 0
+        for page_num in range(1, total_pages + 1):
+            start_idx = (page_num - 1) * posts_per_page
+            end_idx = min(start_idx + posts_per_page, total_posts)
+            page_posts = self.posts[start_idx:end_idx]
+
+            outputs = ["index.html"] if page_num == 1 else [f"page/{page_num}/index.html"]
+            if not self.plan_outputs(outputs, self.index_page_inputs(page_posts, total_pages)):
+                skipped += 1
+                continue
+
+            # Create page content
+            posts_parts = []
+            for post in page_posts:
+                posts_parts.append(f"""
+                <article class="content post home h-entry">
+                    <h2 class="post-title p-name">
+                        <a href="/post/{post['slug']}/" class="summary-title-link u-url">{post['title']}</a>
+                    </h2>
+
+                    <div class="post-meta">
+                        <time datetime="{post['date'].isoformat() if hasattr(post['date'], 'isoformat') else post['date']}" class="post-meta-item published dt-published">
+                            {self.icon_sprite.icon('calendar', 'icon post-meta-icon')} {self.format_date(post['date'])}
+                        </time>
+                        {self.reading_time_html(post.reading_time, post['word_count'])}
+                    </div>
+
+                    <summary class="summary p-summary">
+                        <p>{html.escape(post['summary'], quote=False)}</p>
+                    </summary>
+
+                    <div class="read-more-container">
+                        <a href="/post/{post['slug']}/" class="read-more-link">Read More »</a>
+                    </div>
+                </article>
+                """)
+            posts_html = "".join(posts_parts)
+
+            # Create pagination links
+            pagination_html = ""
+            if total_pages > 1:
+                pagination = ['<ul class="pagination">']
+
+                # Previous page
+                if page_num > 1:
+                    prev_page = page_num - 1
+                    if prev_page == 1:
+                        pagination.append(f'<li class="pagination-prev"><a href="/" rel="prev">&lt; Newer</a></li>')
+                    else:
+                        pagination.append(f'<li class="pagination-prev"><a href="/page/{prev_page}/" rel="prev">&lt; Newer</a></li>')
+
+                # Page numbers
+                previous = 0
+                for p in self.pagination_numbers(page_num, total_pages):
+                    if p > previous + 1:
+                        pagination.append('<li class="pagination-item gap"><span>…</span></li>')
+                    previous = p
+                    if p == page_num:
+                        pagination.append(f'<li class="pagination-item current"><span>{p}</span></li>')
+                    elif p == 1:
+                        pagination.append(f'<li class="pagination-item"><a href="/">{p}</a></li>')
+                    else:
+                        pagination.append(f'<li class="pagination-item"><a href="/page/{p}/">{p}</a></li>')
+
+                # Next page
+                if page_num < total_pages:
+                    pagination.append(f'<li class="pagination-next"><a href="/page/{page_num + 1}/" rel="next">Older &gt;</a></li>')
+
+                pagination.append('</ul>')
+                pagination_html = "".join(pagination)
+
+            # Create the page HTML
+            if page_num == 1:
+                # Homepage
+                page_html = self.create_homepage_html(posts_html, pagination_html)
+                self.write_html(self.output_dir / "index.html", page_html)
+            else:
+                # Other pages
+                page_html = self.create_homepage_html(posts_html, pagination_html, page_num)
+                self.write_html(self.output_dir / "page" / str(page_num) / "index.html", page_html)
+
+        print(f"    Generated {total_pages - skipped} pages with {total_posts} posts total")
+        if skipped:
+            print(f"    Skipped {skipped} unchanged pages")
+
+    def pagination_numbers(self, page_num, total_pages):
+        """Page numbers to link from a page, in order
+
+        Every page is listed on small sites. Larger ones list a window
+        around the current page, so each page's size stays constant instead
+        of growing with the number of pages.
+        """
+        if total_pages <= self.PAGINATION_LIMIT:
+            return range(1, total_pages + 1)
+        low = max(1, page_num - self.PAGINATION_NEIGHBOURS)
+        high = min(total_pages, page_num + self.PAGINATION_NEIGHBOURS)
+        return sorted({1, total_pages, *range(low, high + 1)})
+
+    def create_homepage_html(self, posts_html, pagination_html, page_num=None):
+        """Create homepage HTML with posts and pagination"""
+        # Use the base template
+        template = self.base_template()
+        if template is not None:
+            # Fill placeholders
+            title = "redshiftzero"
+            if page_num and page_num > 1:
+                title = f"redshiftzero - Page {page_num}"
+
+            html = template.render(
+                PAGE_TITLE=title,
+                PAGE_DESCRIPTION="Personal blog about cryptography, security, privacy, and technology.",
+                CANONICAL_URL="https://www.redshiftzero.com/",
+                OG_TYPE="website",
+                TWITTER_CARD="summary",
+                SCHEMA_TYPE="WebSite",
+                PUBLISH_DATE="2025-02-15T00:00:00+00:00",
+                MODIFIED_DATE="2025-03-09T11:04:37-04:00",
+                MAIN_CONTENT=f"""
+                {posts_html}
+                {pagination_html}
+            """,
+            )
+
+            return html
+        else:
+            # Fallback template
+            return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <link rel="stylesheet" href="/css/meme.min.0c24096f9051894f1547a4f579eebdb58f9b546189c9b7bfe789edf9d4be9a9a.css">
+</head>
+<body>
+    <div class="container">
+        <header class="header">
+            <div class="site-brand">
+                <a href="/" class="brand">redshiftzero</a>
+            </div>
+        </header>
+
+        <main class="main">
+            {posts_html}
+            {pagination_html}
+        </main>
+
+        <footer class="footer">
+            <div class="site-info">© 1969–2025 redshiftzero</div>
+        </footer>
+    </div>
+</body>
+</html>"""
+
+    def full_feeds(self):
+        """True if the feeds carry each post's full content"""
+        return self.feeds and self.feed_content == "full"
+
+    def generate_feeds(self):
+        """Write the RSS, Atom, and JSON feeds of the newest posts, and the sitemap
+
+        Each is only regenerated when a post it lists changed, and is
+        streamed to disk an entry at a time.
+        """
+        print("Generating feeds and sitemap...")
+        recent = self.posts[:FEED_ENTRIES]
+        inputs = {f"feed:{post['slug']}": hash_json([encode_record(post), self.content_dates.entries[post['slug']]])
+                  for post in recent}
+        inputs["feed:order"] = hash_json([post['slug'] for post in recent])
+        inputs["feed:content"] = self.feed_content
+        if self.plan_outputs(FEED_OUTPUTS, inputs):
+            entries = [self.feed_entry(post) for post in recent]
+            updated = max((entry.updated for entry in entries if entry.updated), default=None)
+            for name, chunks in zip(FEED_OUTPUTS, (rss_chunks, atom_chunks, json_feed_chunks)):
+                self.writer.write_chunks(self.output_dir / name, chunks(entries, updated))
+            print(f"  Feeds: {len(entries)} newest posts, {self.feed_content} content")
+        else:
+            print("  Skipping unchanged feeds")
+
+        urls = self.sitemap_urls()
+        files = sitemap_files(urls)
+        outputs = [name for name, _ in files]
+        if len(files) > 1:
+            outputs.append("sitemap.xml")
+        inputs = {f"lastmod:{post['slug']}": self.content_dates.entries[post['slug']]['lastmod']
+                  for post in self.posts}
+        inputs["sitemap:urls"] = hash_json([path for path, _ in urls])
+        if self.plan_outputs(outputs, inputs):
+            for name, file_urls in files:
+                self.writer.write_chunks(self.output_dir / name, sitemap_chunks(file_urls))
+            if len(files) > 1:
+                index = [(name, max((lastmod for _, lastmod in file_urls if lastmod), default=None))
+                         for name, file_urls in files]
+                self.writer.write_chunks(self.output_dir / "sitemap.xml", sitemap_index_chunks(index))
+            print(f"  Sitemap: {len(urls)} URLs in {len(files)} file(s)")
+        else:
+            print("  Skipping unchanged sitemap")
+
+        if self.full_feeds():
+            self.fragments.prune({post['slug'] for post in self.posts})
+        self.content_dates.save()
+
+    def feed_entry(self, post):
+        """A post's feed entry, with its cached body when the feeds carry full content"""
+        content = None
+        if self.full_feeds():
+            content = self.fragments.read(post['slug'])
+            content = absolutize(content) if content is not None else None
+        return FeedEntry(
+            url=absolute_url(f"/post/{post['slug']}/"),
+            title=post['title'],
+            published=as_datetime(post['date']),
+            updated=self.content_dates.lastmod(post['slug']),
+            summary=post['summary'],
+            content=content,
+        )
+
+    def sitemap_urls(self):
+        """(path, lastmod) for every page, newest posts first
+
+        Listing pages are as new as the newest post they show.
+        """
+        lastmods = [self.content_dates.lastmod(post['slug']) for post in self.posts]
+        urls = []
+        for start in range(0, len(self.posts), self.POSTS_PER_PAGE):
+            page_num = start // self.POSTS_PER_PAGE + 1
+            path = "/" if page_num == 1 else f"/page/{page_num}/"
+            urls.append((path, max(lastmods[start:start + self.POSTS_PER_PAGE])))
+        urls.append(("/archive/", max(lastmods, default=None)))
+        urls.append(("/about/", None))
+        if self.search:
+            urls.append(("/search/", None))
+        urls += [(f"/post/{post['slug']}/", lastmod) for post, lastmod in zip(self.posts, lastmods)]
+        return urls
+
+    def generate_search_index(self):
+        """Write the sharded search index, its JS client, and the search page
+
+        Every file is an output in the dependency graph, so
+        remove_stale_outputs() deletes shards only an earlier build listed
+        and, once --search is dropped, the whole directory, in full and
+        incremental builds alike.
+        """
+        print("Generating search index...")
+        search_dir = self.output_dir / "search"
+        posts = sorted(self.posts, key=lambda x: x['date'], reverse=True)
+        files = self.search_index.build(posts, self.format_date)
+        self.search_index.save()
+
+        client_path = Path(__file__).parent / "search.js"
+        outputs = ["search/index.html", "search/search.js"] + [f"search/{name}" for name in files]
+        # index.json names every shard and document file by its contents
+        inputs = {'search:index': hash_json(files["index.json"]),
+                  'search:client': self.source_hash(client_path),
+                  **self.shared_inputs}
+        if not self.plan_outputs(outputs, inputs):
+            print("  Skipping unchanged search index")
+            return
+
+        for name, text in files.items():
+            self.writer.write_text(search_dir / name, text)
+        self.writer.write_text(search_dir / "search.js", client_path.read_text(encoding='utf-8'))
+
+        template = self.base_template()
+        if template is not None:
+            html = template.render(
+                PAGE_TITLE="Search | redshiftzero",
+                PAGE_DESCRIPTION="Search all blog posts",
+                CANONICAL_URL="https://www.redshiftzero.com/search/",
+                OG_TYPE="website",
+                TWITTER_CARD="summary",
+                SCHEMA_TYPE="WebPage",
+                PUBLISH_DATE="2025-02-15T00:00:00+00:00",
+                MODIFIED_DATE="2025-03-09T11:04:37-04:00",
+                MAIN_CONTENT="""
+                <article class="content page">
+                    <h1 class="page-title">Search</h1>
+                    <input type="search" id="search-input" class="search-input" placeholder="Search posts"
+                        aria-label="Search posts" autocomplete="off" autofocus />
+                    <div id="search-results" class="archive-list"></div>
+                    <script src="/search/search.js" defer></script>
+                </article>
+            """,
+            )
+            self.write_html(search_dir / "index.html", html)
+
+        size = sum(len(text.encode('utf-8')) for text in files.values())
+        print(f"  Indexed {len(posts)} posts into {len(files) - 1} file(s), {size / 1024:.0f} KB")
+
+    def archive_list_chunks(self):
+        """The archive list, a chunk per post"""
+        yield '<div class="archive-list">'
+        for post in self.posts:
+            date_str = post['date'].strftime('%Y.%m.%d') if hasattr(post['date'], 'strftime') else str(post['date'])
+            yield f"""
+            <div class="archive-item">
+                <time class="archive-date">{date_str}</time>
+                <a href="/post/{post['slug']}/" class="archive-title">{post['title']}</a>
+            </div>
+            """
+        yield '</div>'
+
+    def archive_content_chunks(self):
+        """The archive page's main content, a chunk per post"""
+        yield f"""
+                <article class="content page">
+                    <h1 class="page-title">Archive</h1>
+                    <p>Complete list of all {len(self.posts)} blog posts:</p>
+                    """
+        yield from self.archive_list_chunks()
+        yield """
+                </article>
+            """
+
+    def generate_archive_page(self):
+        """Generate an archive page with all post titles"""
+        print("  Generating archive page...")
+
+        # Sort posts by date (newest first)
+        self.posts.sort(key=lambda x: x['date'], reverse=True)
+
+        # Create archive page HTML, a chunk per post, so that the list is
+        # never built up as one string
+        template = self.base_template()
+        if template is not None:
+            chunks = template.render_chunks(
+                PAGE_TITLE="Archive | redshiftzero",
+                PAGE_DESCRIPTION="Complete archive of all blog posts",
+                CANONICAL_URL="https://www.redshiftzero.com/archive/",
+                OG_TYPE="website",
+                TWITTER_CARD="summary",
+                SCHEMA_TYPE="WebPage",
+                PUBLISH_DATE="2025-02-15T00:00:00+00:00",
+                MODIFIED_DATE="2025-03-09T11:04:37-04:00",
+                MAIN_CONTENT=self.archive_content_chunks(),
+            )
+
+            # Save archive page
+            self.write_html_chunks(self.output_dir / "archive" / "index.html", chunks)
+        else:
+            archive_html = "".join(self.archive_list_chunks())
+            # Fallback template
+            archive_html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Archive | redshiftzero</title>
+    <link rel="stylesheet" href="/css/meme.min.0c24096f9051894f1547a4f579eebdb58f9b546189c9b7bfe789edf9d4be9a9a.css">
+</head>
+<body>
+    <div class="container">
+        <header class="header">
+            <div class="site-brand">
+                <a href="/" class="brand">redshiftzero</a>
+            </div>
+        </header>
+
+        <main class="main">
+            <article class="content page">
+                <h1 class="page-title">Archive</h1>
+                <p>Complete list of all {len(self.posts)} blog posts:</p>
+                {archive_html}
+            </article>
+        </main>
+
+        <footer class="footer">
+            <div class="site-info">© 1969–2025 redshiftzero</div>
+        </footer>
+    </div>
+</body>
+</html>"""
+
+            self.write_html(self.output_dir / "archive" / "index.html", archive_html)
+
+    def generate_about_page(self):
+        """Generate an about page from Markdown content"""
+        print("  Generating about page...")
+
+        # Check if there's a Markdown about page
+        about_md_path = Path("../content/about/index.md")
+        if about_md_path.exists():
+            # Convert Markdown to HTML
+            with open(about_md_path, 'r', encoding='utf-8') as f:
+                md_content = f.read()
+
+            # Parse frontmatter and content
+            if md_content.startswith('---'):
+                # Extract frontmatter and content (YAML format)
+                parts = md_content.split('---', 2)
+                if len(parts) >= 3:
+                    frontmatter_text = parts[1]
+                    content_text = parts[2]
+                else:
+                    content_text = md_content
+            elif md_content.startswith('+++'):
+                # Extract frontmatter and content (Hugo format)
+                parts = md_content.split('+++', 2)
+                if len(parts) >= 3:
+                    frontmatter_text = parts[1]
+                    content_text = parts[2]
+                else:
+                    content_text = md_content
+            else:
+                content_text = md_content
+
+            # Convert Markdown to HTML
+            html_content = renderer.convert('about', content_text)
+
+            # Use the base template
+            template = self.base_template()
+            if template is not None:
+                html = template.render(
+                    PAGE_TITLE="About | redshiftzero",
+                    PAGE_DESCRIPTION="About redshiftzero",
+                    CANONICAL_URL="https://www.redshiftzero.com/about/",
+                    OG_TYPE="website",
+                    TWITTER_CARD="summary",
+                    SCHEMA_TYPE="WebPage",
+                    PUBLISH_DATE="2025-02-15T00:00:00+00:00",
+                    MODIFIED_DATE="2025-03-09T11:04:37-04:00",
+                    MAIN_CONTENT=f"""
+                <article class="content page">
+                    <h1 class="page-title">About</h1>
+                    <div class="page-body">
+                        {html_content}
+                    </div>
+                </article>
+                """,
+                )
+
+                self.write_html(self.output_dir / "about" / "index.html", html)
+                print("    Created about page from Markdown content")
+            else:
+                print("    Error: base template not found")
+        else:
+            print("    Warning: No about/index.md found, using placeholder")
+            # Fallback to placeholder content
+            template = self.base_template()
+            if template is not None:
+                html = template.render(
+                    PAGE_TITLE="About | redshiftzero",
+                    PAGE_DESCRIPTION="About redshiftzero",
+                    CANONICAL_URL="https://www.redshiftzero.com/about/",
+                    OG_TYPE="website",
+                    TWITTER_CARD="summary",
+                    SCHEMA_TYPE="WebPage",
+                    PUBLISH_DATE="2025-02-15T00:00:00+00:00",
+                    MODIFIED_DATE="2025-03-09T11:04:37-04:00",
+                    MAIN_CONTENT="""
+                <article class="content page">
+                    <h1 class="page-title">About</h1>
+                    <div class="page-body">
+                        <p>Welcome to my blog! I write about cryptography, security, privacy, and technology.</p>
+                        <p>This is a placeholder about page. Create a <code>content/about/index.md</code> file to add your content.</p>
+                    </div>
+                </article>
+                """,
+                )
+
+                self.write_html(self.output_dir / "about" / "index.html", html)
+                print("    Created placeholder about page")
+
+def code_fingerprint():
+    """Hashes of the builder's own code"""
+    package_dir = Path(__file__).parent
+    code_paths = [package_dir.parent / "build.py"] + sorted(package_dir.glob("*.py"))
+    return [hash_file(path) for path in code_paths]
+
+def warm_up():
+    """Build the Markdown engines before the daemon's first request"""
+    for name in ENGINE_CONFIGS:
+        renderer.engine(name)
+
+# Process pool workers render posts with a builder of their own; it only
+# needs the directories, never the parent's manifest or post list
+_worker_builder = None
+
+def _init_render_worker(source_dir, output_dir, cache_dir, highlight_cache_size, search,
+                        feeds, feed_content):
+    global _worker_builder
+    _worker_builder = StaticSiteBuilder(source_dir=source_dir, output_dir=output_dir,
+                                        cache_dir=cache_dir,
+                                        highlight_cache_size=highlight_cache_size,
+                                        search=search, feeds=feeds, feed_content=feed_content)
+    _worker_builder.use_highlight_cache()
+
+def _render_post_in_worker(md_file):
+    stats_before = renderer.stats.copy()
+    timer = PhaseTimer()
+    result = _worker_builder.render_post(md_file, timer)
+    return result, timer, os.getpid(), renderer.stats.since(stats_before)
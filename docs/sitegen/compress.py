@@ -0,0 +1,141 @@
+"""
+Pre-compressed .gz and .br siblings for compressible build outputs.
+Static hosts (and serve.py) send these directly to clients that accept
+them, instead of compressing every response on the fly. Brotli is used when
+the brotli package is installed; gzip always is.
+"""
+
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sitegen.output import walk_outputs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".svg", ".json", ".xml"}
+
+# Sibling suffix and compressor for each format
+FORMATS = {
+    "gzip": (".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+    "brotli": (".br", lambda data: brotli.compress(data, quality=11)),
+}
+
+
+def available_formats():
+    """Formats that can be produced with the installed packages"""
+    return [name for name in FORMATS if name != "brotli" or brotli is not None]
+
+
+class CompressStats:
+    """Sizes before and after compression, per format"""
+
+    def __init__(self, formats):
+        self.formats = formats
+        self.compressed = 0
+        self.up_to_date = 0
+        self.removed = 0
+        self.original_bytes = 0
+        self.compressed_bytes = dict.fromkeys(formats, 0)
+
+    def add(self, original_size, sizes, wrote):
+        self.original_bytes += original_size
+        for name, size in sizes.items():
+            self.compressed_bytes[name] += size
+        if wrote:
+            self.compressed += 1
+        else:
+            self.up_to_date += 1
+
+    def summary(self):
+        lines = [f"{self.compressed} compressed, {self.up_to_date} up to date, "
+                 f"{self.removed} stale sibling(s) removed"]
+        for name in self.formats:
+            size = self.compressed_bytes[name]
+            saved = self.original_bytes - size
+            percent = saved / self.original_bytes * 100 if self.original_bytes else 0
+            lines.append(f"{name}: {self.original_bytes / 1024:.0f} KB -> {size / 1024:.0f} KB "
+                         f"(saves {saved / 1024:.0f} KB, {percent:.0f}%)")
+        return lines
+
+
+def compressible_files(root, exclude=()):
+    """Yield the files under root worth pre-compressing"""
+    for dirpath, name in walk_outputs(root, exclude):
+        if os.path.splitext(name)[1] in COMPRESSIBLE_SUFFIXES:
+            yield Path(dirpath) / name
+
+
+def _write_atomic(path, data):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def compress_file(path, formats):
+    """Write the siblings of one file that are missing or older than it
+
+    Returns (original size, {format: sibling size}, whether anything was
+    written).
+    """
+    path = Path(path)
+    source_stat = path.stat()
+    data = None
+    sizes = {}
+    wrote = False
+    for name in formats:
+        suffix, compress = FORMATS[name]
+        sibling = path.with_name(path.name + suffix)
+        try:
+            sibling_stat = sibling.stat()
+        except FileNotFoundError:
+            sibling_stat = None
+        if sibling_stat is not None and sibling_stat.st_mtime_ns >= source_stat.st_mtime_ns:
+            sizes[name] = sibling_stat.st_size
+            continue
+
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = compress(data)
+        _write_atomic(sibling, compressed)
+        sizes[name] = len(compressed)
+        wrote = True
+    return source_stat.st_size, sizes, wrote
+
+
+def remove_orphans(root, exclude=()):
+    """Delete siblings whose source file no longer exists; returns the count"""
+    removed = 0
+    suffixes = tuple(suffix for suffix, _ in FORMATS.values())
+    for dirpath, name in walk_outputs(root, exclude):
+        if not name.endswith(suffixes):
+            continue
+        source = os.path.join(dirpath, os.path.splitext(name)[0])
+        if os.path.splitext(source)[1] in COMPRESSIBLE_SUFFIXES and not os.path.exists(source):
+            os.unlink(os.path.join(dirpath, name))
+            removed += 1
+    return removed
+
+
+def compress_tree(root, exclude=(), workers=None):
+    """Compress every compressible file under root in parallel
+
+    zlib and brotli release the GIL while compressing, so a thread pool
+    keeps every core busy without the cost of pickling file contents
+    between processes.
+    """
+    formats = available_formats()
+    stats = CompressStats(formats)
+    files = list(compressible_files(root, exclude))
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for original_size, sizes, wrote in executor.map(lambda path: compress_file(path, formats), files):
+            stats.add(original_size, sizes, wrote)
+    stats.removed = remove_orphans(root, exclude)
+    return stats
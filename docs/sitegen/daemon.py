@@ -0,0 +1,211 @@
+"""
+Build daemon that keeps builders warm between builds.
+The daemon listens on a Unix socket and keeps a StaticSiteBuilder for each
+set of options it is asked to build with. Markdown engines, the highlight
+cache, the compiled template, the manifest, and source hashes therefore
+stay in memory from one build to the next, and build.py only has to send a
+request. Messages are JSON, one per line: the client sends
+{"command": "build", "cwd": ..., "options": {...}} and gets back an
+{"output": ...} message for everything the build prints, then a
+{"status": ...} message.
+"""
+
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+import traceback
+from pathlib import Path
+
+SOCKET_NAME = "build.sock"
+
+# Builders kept warm, one per distinct working directory and options
+MAX_BUILDERS = 4
+
+
+def send(stream, message):
+    stream.write(json.dumps(message).encode('utf-8') + b"\n")
+    stream.flush()
+
+
+class ClientOutput:
+    """File-like object forwarding what a build prints to the client"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.connected = True
+
+    def write(self, text):
+        if text and self.connected:
+            try:
+                send(self.stream, {"output": text})
+            except OSError:
+                # The client went away; the build still finishes, so the
+                # manifest on disk matches the outputs
+                self.connected = False
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    """Reads one request and answers it"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        command = request.get('command')
+        if command == 'build':
+            reply = self.server.run_build(request['cwd'], request['options'], ClientOutput(self.wfile))
+        elif command == 'stop':
+            self.server.stopping = True
+            reply = {"status": "ok"}
+        else:
+            reply = {"status": "error", "message": f"unknown command {command!r}"}
+        try:
+            send(self.wfile, reply)
+        except OSError:
+            pass
+
+
+class BuildDaemon(socketserver.UnixStreamServer):
+    """Runs builds one at a time for clients connecting to a Unix socket
+
+    make_builder is called with a request's options to create a builder.
+    code_fingerprint returns a digest of the builder's code; once it
+    changes the daemon refuses to build and restarts itself, so it never
+    builds with stale code. Exceptions of the types in errors are reported
+    by message alone, and any other exception with its traceback.
+    """
+
+    def __init__(self, socket_path, make_builder, code_fingerprint, errors=()):
+        self.socket_path = Path(socket_path)
+        self.make_builder = make_builder
+        self.code_fingerprint = code_fingerprint
+        self.code = code_fingerprint()
+        self.errors = errors
+        self.builders = {}
+        self.stopping = False
+        self.restart = False
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            if is_listening(self.socket_path):
+                raise OSError(f"A build daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()
+        super().__init__(str(self.socket_path), BuildRequestHandler)
+
+    def builder_for(self, cwd, options):
+        """The warm builder for a directory and options, creating it if needed"""
+        key = json.dumps([cwd, options], sort_keys=True)
+        builder = self.builders.pop(key, None)
+        if builder is None:
+            builder = self.make_builder(**options)
+        # Most recently used last, so the oldest is dropped first
+        self.builders[key] = builder
+        while len(self.builders) > MAX_BUILDERS:
+            self.builders.pop(next(iter(self.builders)))
+        return key, builder
+
+    def run_build(self, cwd, options, output):
+        """Build with a warm builder, sending its output to the client"""
+        if self.code_fingerprint() != self.code:
+            self.stopping = self.restart = True
+            return {"status": "stale"}
+
+        start = time.perf_counter()
+        key, builder = self.builder_for(cwd, options)
+        # Builders use paths relative to the client's directory; the
+        # daemon's own socket path is relative to where it started
+        home = os.getcwd()
+        os.chdir(cwd)
+        try:
+            with contextlib.redirect_stdout(output):
+                builder.build()
+        except Exception as e:
+            # A failed build may have left the builder half updated
+            self.builders.pop(key, None)
+            print(f"Build in {cwd} failed")
+            if isinstance(e, self.errors):
+                return {"status": "error", "message": str(e)}
+            output.write(traceback.format_exc())
+            return {"status": "error", "message": f"the build raised {type(e).__name__}"}
+        finally:
+            os.chdir(home)
+        print(f"Built {cwd} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return {"status": "ok"}
+
+    def run(self):
+        """Answer requests until asked to stop"""
+        print(f"Build daemon listening on {self.socket_path}")
+        try:
+            while not self.stopping:
+                self.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+        if self.restart:
+            print("Builder code changed, restarting")
+            sys.stdout.flush()
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+        print("Build daemon stopped")
+
+
+def is_listening(socket_path):
+    """True if a daemon accepts connections on socket_path"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def _request(socket_path, message):
+    """Send a request, yielding each message of the reply
+
+    Yields nothing if no daemon is listening.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return
+    with sock, sock.makefile('rwb') as stream:
+        send(stream, message)
+        for line in stream:
+            yield json.loads(line)
+
+
+def request_build(socket_path, options):
+    """Ask a running daemon to build, printing what the build prints
+
+    Returns the daemon's final status message, or None if no daemon is
+    listening.
+    """
+    message = {"command": "build", "cwd": os.getcwd(), "options": options}
+    for reply in _request(socket_path, message):
+        if 'output' in reply:
+            sys.stdout.write(reply['output'])
+            continue
+        return reply
+    if Path(socket_path).exists() and is_listening(socket_path):
+        return {"status": "error", "message": "the build daemon closed the connection"}
+    return None
+
+
+def stop_daemon(socket_path):
+    """Ask a running daemon to exit; False if none was listening"""
+    for reply in _request(socket_path, {"command": "stop"}):
+        return reply.get('status') == 'ok'
+    return False
@@ -0,0 +1,258 @@
+"""
+RSS, Atom, and JSON feeds and the sitemap.
+Documents are generated as chunks, an entry or URL at a time, for
+OutputWriter.write_chunks(). Post bodies for full-content feeds come from
+a cache of each post's rendered HTML, and modification dates from a record
+of each post's source hash: a post's lastmod is its publication date until
+its source first changes, then the time of the build that saw the change.
+"""
+
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+SITE_URL = "https://www.redshiftzero.com"
+SITE_TITLE = "redshiftzero"
+SITE_DESCRIPTION = "Recent content on redshiftzero"
+
+# Newest posts listed in each feed
+FEED_ENTRIES = 20
+CONTENT_MODES = ("full", "summary")
+
+# URLs per sitemap file, the limit set by the sitemaps protocol
+SITEMAP_LIMIT = 50000
+
+FEED_OUTPUTS = ["rss.xml", "atom.xml", "feed.json"]
+
+_ROOT_URL_RE = re.compile(r'(\s(?:href|src)=")/(?!/)')
+
+
+def absolute_url(path):
+    return SITE_URL + path
+
+
+def absolutize(fragment):
+    """Point root-relative links in an HTML fragment at the site, as feed readers need"""
+    return _ROOT_URL_RE.sub(lambda m: m.group(1) + SITE_URL + "/", fragment)
+
+
+def as_datetime(value):
+    """A post date as an aware datetime; naive dates are taken to be UTC"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    return None
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def escape(text):
+    """Escape text for XML character data"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def quoteattr(text):
+    """Escape and quote text for an XML attribute value"""
+    return '"' + escape(text).replace('"', "&quot;") + '"'
+
+
+class FeedEntry:
+    """One post as the feeds show it"""
+
+    __slots__ = ('url', 'title', 'published', 'updated', 'summary', 'content')
+
+    def __init__(self, url, title, published, updated, summary, content=None):
+        self.url = url
+        self.title = title
+        self.published = published
+        self.updated = updated
+        self.summary = summary
+        self.content = content
+
+
+class ContentDates:
+    """Each post's source hash and the last time it changed, kept between builds"""
+
+    def __init__(self, cache_path):
+        self.cache_path = Path(cache_path)
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.seen = set()
+
+    def touch(self, slug, content_hash, published, now):
+        """Record a post's hash, returning its lastmod as an ISO string"""
+        self.seen.add(slug)
+        entry = self.entries.get(slug)
+        if entry is not None and entry['hash'] == content_hash:
+            return entry['lastmod']
+        changed = now if entry is not None else as_datetime(published)
+        lastmod = _iso(changed or now)
+        self.entries[slug] = {'hash': content_hash, 'lastmod': lastmod}
+        return lastmod
+
+    def lastmod(self, slug):
+        entry = self.entries.get(slug)
+        return datetime.fromisoformat(entry['lastmod']) if entry else None
+
+    def save(self):
+        """Write the dates of the posts touched this build, dropping the rest"""
+        entries = {slug: self.entries[slug] for slug in sorted(self.seen)}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp_path, self.cache_path)
+
+
+class FragmentCache:
+    """Rendered post bodies, one file per slug, for full-content feeds"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, slug):
+        return self.root / f"{slug}.html"
+
+    def has(self, slug):
+        return self._path(slug).exists()
+
+    def read(self, slug):
+        try:
+            return self._path(slug).read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def write(self, slug, fragment):
+        path = self._path(slug)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(fragment)
+        os.replace(tmp_path, path)
+
+    def prune(self, slugs):
+        """Delete bodies of posts not in slugs"""
+        if not self.root.exists():
+            return
+        for path in self.root.glob("*.html"):
+            if path.stem not in slugs:
+                path.unlink()
+
+
+def _element(name, text):
+    return f"<{name}>{escape(text)}</{name}>"
+
+
+def rss_chunks(entries, updated):
+    """An RSS 2.0 document"""
+    from email.utils import format_datetime
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n'
+           '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n'
+           f"{_element('title', SITE_TITLE)}\n{_element('link', SITE_URL + '/')}\n"
+           f"{_element('description', SITE_DESCRIPTION)}\n<language>en</language>\n"
+           f'<atom:link href={quoteattr(absolute_url("/rss.xml"))} rel="self" type="application/rss+xml" />\n')
+    if updated:
+        yield f"{_element('lastBuildDate', format_datetime(updated))}\n"
+    for entry in entries:
+        item = [_element('title', entry.title), _element('link', entry.url),
+                f'<guid isPermaLink="true">{escape(entry.url)}</guid>']
+        if entry.published:
+            item.append(_element('pubDate', format_datetime(entry.published)))
+        item.append(_element('description', entry.content if entry.content is not None else entry.summary))
+        yield "<item>\n" + "\n".join(item) + "\n</item>\n"
+    yield "</channel>\n</rss>\n"
+
+
+def atom_chunks(entries, updated):
+    """An Atom 1.0 document"""
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n'
+           '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+           f"{_element('title', SITE_TITLE)}\n{_element('subtitle', SITE_DESCRIPTION)}\n"
+           f"{_element('id', SITE_URL + '/')}\n"
+           f'<link href={quoteattr(SITE_URL + "/")} />\n'
+           f'<link href={quoteattr(absolute_url("/atom.xml"))} rel="self" />\n'
+           f"<author>{_element('name', SITE_TITLE)}</author>\n")
+    if updated:
+        yield f"{_element('updated', _iso(updated))}\n"
+    for entry in entries:
+        item = [_element('title', entry.title), _element('id', entry.url),
+                f"<link href={quoteattr(entry.url)} />"]
+        if entry.published:
+            item.append(_element('published', _iso(entry.published)))
+        if entry.updated or entry.published:
+            item.append(_element('updated', _iso(entry.updated or entry.published)))
+        item.append(f'<summary type="html">{escape(entry.summary)}</summary>')
+        if entry.content is not None:
+            item.append(f'<content type="html">{escape(entry.content)}</content>')
+        yield "<entry>\n" + "\n".join(item) + "\n</entry>\n"
+    yield "</feed>\n"
+
+
+def json_feed_chunks(entries, updated):
+    """A JSON Feed 1.1 document"""
+    head = json.dumps({
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": SITE_TITLE,
+        "description": SITE_DESCRIPTION,
+        "home_page_url": SITE_URL + "/",
+        "feed_url": absolute_url("/feed.json"),
+        "language": "en",
+    }, ensure_ascii=False, indent=1)
+    yield head[:-2] + ',\n "items": ['
+    for number, entry in enumerate(entries):
+        item = {"id": entry.url, "url": entry.url, "title": entry.title, "summary": entry.summary}
+        if entry.content is not None:
+            item["content_html"] = entry.content
+        else:
+            item["content_text"] = entry.summary
+        if entry.published:
+            item["date_published"] = _iso(entry.published)
+        if entry.updated:
+            item["date_modified"] = _iso(entry.updated)
+        yield ("," if number else "") + "\n  " + json.dumps(item, ensure_ascii=False)
+    yield "\n ]\n}\n"
+
+
+def sitemap_files(urls):
+    """Split (path, lastmod) pairs into sitemap files
+
+    Returns a list of (file name, URLs in it). Sites with more URLs than
+    one file may hold get numbered files listed by a sitemap index.
+    """
+    if len(urls) <= SITEMAP_LIMIT:
+        return [("sitemap.xml", urls)]
+    return [(f"sitemap-{start // SITEMAP_LIMIT + 1}.xml", urls[start:start + SITEMAP_LIMIT])
+            for start in range(0, len(urls), SITEMAP_LIMIT)]
+
+
+def sitemap_chunks(urls):
+    """A sitemap of (path, lastmod) pairs"""
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n'
+           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for path, lastmod in urls:
+        lastmod_element = f"<lastmod>{_iso(lastmod)}</lastmod>" if lastmod else ""
+        yield f"<url><loc>{escape(absolute_url(path))}</loc>{lastmod_element}</url>\n"
+    yield "</urlset>\n"
+
+
+def sitemap_index_chunks(files):
+    """A sitemap index of (file name, lastmod) pairs"""
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n'
+           '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for name, lastmod in files:
+        lastmod_element = f"<lastmod>{_iso(lastmod)}</lastmod>" if lastmod else ""
+        yield f"<sitemap><loc>{escape(absolute_url('/' + name))}</loc>{lastmod_element}</sitemap>\n"
+    yield "</sitemapindex>\n"
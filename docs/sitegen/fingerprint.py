@@ -0,0 +1,182 @@
+"""
+Content-hashed copies of static assets, for long-lived caching.
+Every asset gets a copy named name.<hash>.ext next to it, and generated
+pages and stylesheets are pointed at the copies. Because a changed file
+gets a new URL, the copies can be served as immutable. The originals stay
+in place for external links. The mapping is exported as
+asset-manifest.json, and the matching cache rules as a _headers file for
+hosts that read one.
+"""
+
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from sitegen.manifest import hash_bytes, hash_json
+
+HASH_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Last path component of a fingerprinted file: name.<hash>.ext, or an image
+# variant's name.<hash>.<width>w.ext
+FINGERPRINTED_RE = re.compile(r"\.[0-9a-f]{%d}\.[^/]+$" % HASH_LENGTH)
+
+# Pre-compressed siblings are found next to whatever file they compress
+SKIP_SUFFIXES = {".gz", ".br"}
+
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_HTML_URL_RE = re.compile(r"""(\s(?:href|src)=")(/[^"#?]+)([^"]*")""")
+
+
+def fingerprinted_name(rel_path, digest):
+    stem, ext = posixpath.splitext(rel_path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def _split_url(url):
+    """Split a URL into its path and any ?query or #fragment suffix"""
+    match = re.match(r"([^?#]*)(.*)$", url)
+    return match.group(1), match.group(2)
+
+
+class AssetFingerprinter:
+    """Writes hashed copies of assets and rewrites references to them"""
+
+    def __init__(self, output_dir, directories, immutable_patterns=()):
+        self.output_dir = Path(output_dir)
+        self.directories = directories
+        # URL patterns of files that are already content-addressed
+        self.immutable_patterns = immutable_patterns
+        self.manifest_path = self.output_dir / "asset-manifest.json"
+        self.headers_path = self.output_dir / "_headers"
+        # Original path -> fingerprinted path, both relative to output_dir
+        self.assets = {}
+        self.urls = {}
+        self.written = 0
+        self.removed = 0
+
+    def _asset_files(self):
+        for directory in self.directories:
+            root = self.output_dir / directory
+            if not root.is_dir():
+                continue
+            for path in sorted(root.rglob("*")):
+                if (not path.is_file() or path.name.startswith(".")
+                        or path.suffix in SKIP_SUFFIXES or FINGERPRINTED_RE.search(path.name)):
+                    continue
+                yield path.relative_to(self.output_dir).as_posix()
+
+    def _write(self, rel_path, data):
+        path = self.output_dir / rel_path
+        if path.exists():
+            return
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.written += 1
+
+    def rewrite_css(self, css, css_path):
+        """Point url()s in a stylesheet at fingerprinted copies"""
+        css_dir = posixpath.dirname(css_path)
+
+        def replace(match):
+            quote, url = match.groups()
+            path, suffix = _split_url(url)
+            if not path or "://" in path or path.startswith(("data:", "//")):
+                return match.group()
+            if path.startswith("/"):
+                target = self.assets.get(path[1:])
+                new_path = target and "/" + target
+            else:
+                target = self.assets.get(posixpath.normpath(posixpath.join(css_dir, path)))
+                new_path = target and posixpath.join(posixpath.dirname(path), posixpath.basename(target))
+            if not new_path:
+                return match.group()
+            return f"url({quote}{new_path}{suffix}{quote})"
+
+        return _CSS_URL_RE.sub(replace, css)
+
+    def build(self):
+        """Fingerprint every asset and export the manifest and _headers
+
+        Stylesheets are hashed after their url()s are rewritten, so a
+        stylesheet's name changes whenever a font or image it uses does.
+        Returns a digest of the mapping.
+        """
+        previous = self._load_manifest()
+        files = list(self._asset_files())
+        stylesheets = [path for path in files if path.endswith(".css")]
+
+        for rel_path in files:
+            if rel_path.endswith(".css"):
+                continue
+            data = (self.output_dir / rel_path).read_bytes()
+            self._add(rel_path, data)
+        for rel_path in stylesheets:
+            css = (self.output_dir / rel_path).read_text(encoding='utf-8')
+            self._add(rel_path, self.rewrite_css(css, rel_path).encode('utf-8'))
+
+        # Remove copies of earlier versions
+        current = set(self.assets.values())
+        for old in previous.values():
+            if old not in current and (self.output_dir / old).exists():
+                (self.output_dir / old).unlink()
+                self.removed += 1
+
+        self._write_if_changed(self.manifest_path,
+                               json.dumps(self.assets, indent=1, sort_keys=True) + "\n")
+        self._write_if_changed(self.headers_path, self.headers())
+        return hash_json(self.assets)
+
+    def _add(self, rel_path, data):
+        target = fingerprinted_name(rel_path, hash_bytes(data))
+        self._write(target, data)
+        self.assets[rel_path] = target
+        self.urls["/" + rel_path] = "/" + target
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_if_changed(self, path, text):
+        try:
+            if path.read_text(encoding='utf-8') == text:
+                return
+        except OSError:
+            pass
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def headers(self):
+        """Cache rules in the _headers format read by Netlify and Cloudflare Pages"""
+        lines = ["# Generated by build.py --fingerprint; fingerprinted assets never change"]
+        for url in sorted(self.urls.values()):
+            lines += [url, f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}"]
+        for pattern in self.immutable_patterns:
+            lines += [pattern, f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}"]
+        return "\n".join(lines) + "\n"
+
+    def rewrite_html(self, html):
+        """Point href and src attributes at fingerprinted copies"""
+        if not self.urls:
+            return html
+
+        def replace(match):
+            target = self.urls.get(match.group(2))
+            if target is None:
+                return match.group()
+            return match.group(1) + target + match.group(3)
+
+        return _HTML_URL_RE.sub(replace, html)
+
+    def summary(self):
+        return (f"{len(self.assets)} asset(s) fingerprinted: {self.written} new copies written, "
+                f"{self.removed} outdated removed")
@@ -0,0 +1,137 @@
+"""
+Front matter parsing for posts.
+Hugo-style +++ blocks are parsed with tomllib and --- blocks with PyYAML's
+C loader when it is available. Both parsers are only imported once a
+block needs them. Dates are parsed once per distinct string.
+"""
+
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+
+TOML_RE = re.compile(r'^\+\+\+(.*?)\+\+\+\s*(.*)', re.DOTALL)
+YAML_BOUNDARY_RE = re.compile(r'^-{3,}\s*$', re.MULTILINE)
+
+
+class FrontmatterError(ValueError):
+    """Raised when a post's front matter cannot be parsed"""
+
+
+class PostMeta:
+    """Metadata read from a post's front matter"""
+
+    __slots__ = ('title', 'date', 'slug', 'draft', 'params')
+
+    def __init__(self, title, date, slug, draft=False, params=None):
+        self.title = title
+        self.date = date
+        self.slug = slug
+        self.draft = draft
+        self.params = params or {}
+
+    def __repr__(self):
+        return f"PostMeta(title={self.title!r}, date={self.date!r}, slug={self.slug!r})"
+
+
+@lru_cache(maxsize=None)
+def _parse_date_string(value):
+    try:
+        from dateutil import parser
+    except ImportError:
+        return datetime.strptime(value, "%Y-%m-%d")
+    return parser.parse(value).replace(tzinfo=None)
+
+
+def parse_date(value):
+    """Turn a front matter date into a timezone-naive datetime
+
+    Unparseable strings fall back to the current time, as Hugo does for
+    posts without a date.
+    """
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None) if value.tzinfo is not None else value
+    if isinstance(value, date):
+        # Bare TOML and YAML dates are read as midnight, like quoted ones
+        return datetime.combine(value, time())
+    if isinstance(value, str):
+        try:
+            return _parse_date_string(value)
+        except (ValueError, OverflowError):
+            return datetime.now()
+    return value
+
+
+def split_frontmatter(text):
+    """Split a post into (format, front matter text, content)
+
+    format is 'toml', 'yaml', or None when the post has no front matter.
+    """
+    if text.startswith('+++'):
+        match = TOML_RE.match(text)
+        if match:
+            return 'toml', match.group(1), match.group(2)
+        return None, '', text
+
+    stripped = text.strip()
+    if YAML_BOUNDARY_RE.match(stripped):
+        parts = YAML_BOUNDARY_RE.split(stripped, 2)
+        if len(parts) == 3:
+            return 'yaml', parts[1], parts[2].strip()
+    return None, '', stripped
+
+
+def _load_toml(text):
+    """Parse TOML, raising ValueError if it is invalid"""
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+    return tomllib.loads(text)
+
+
+def _load_yaml(text):
+    """Parse YAML, raising ValueError if it is invalid"""
+    import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        return yaml.load(text, Loader=loader)
+    except yaml.YAMLError as e:
+        raise ValueError(str(e)) from e
+
+
+def load_frontmatter(fmt, fm_text, source="post"):
+    """Parse front matter text into a dict"""
+    try:
+        if fmt == 'toml':
+            metadata = _load_toml(fm_text)
+        elif fmt == 'yaml':
+            metadata = _load_yaml(fm_text)
+        else:
+            return {}
+    except ValueError as e:
+        raise FrontmatterError(f"{source}: invalid {fmt.upper()} front matter: {e}") from e
+
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def parse_post(text, default_slug, source="post"):
+    """Parse a post's front matter
+
+    Returns (PostMeta, content).
+    """
+    fmt, fm_text, content = split_frontmatter(text)
+    metadata = load_frontmatter(fmt, fm_text, source)
+
+    post_date = metadata.get('date', None)
+    if post_date is None:
+        post_date = datetime.now()
+    post_date = parse_date(post_date)
+
+    meta = PostMeta(
+        title=metadata.get('title', default_slug),
+        date=post_date,
+        slug=metadata.get('slug', default_slug),
+        draft=metadata.get('draft', False),
+        params=metadata,
+    )
+    return meta, content
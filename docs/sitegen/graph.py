@@ -0,0 +1,70 @@
+"""
+Dependency graph from build sources to the outputs made from them.
+Each output is recorded with a digest of every input it was rendered from:
+the template, socials.toml, the about page, or one facet of a post (its
+source, its index record, or its archive listing). On the next build an
+output is only rebuilt if one of those digests changed or the file has
+gone, and the graph can say which. The outputs of the previous build are
+kept even when its digests are not trusted, so stale ones can be found
+after a full build too.
+"""
+
+from pathlib import Path
+
+# Changed inputs named in an explanation before the rest are counted
+EXPLAIN_INPUTS = 3
+
+
+class DependencyGraph:
+    """Inputs of every output, from the previous build and this one"""
+
+    def __init__(self, output_dir, previous=None, previous_outputs=None):
+        self.output_dir = Path(output_dir)
+        # Output path -> {input name: digest}
+        self.previous = previous or {}
+        # Every output the previous build wrote, digests trusted or not
+        self.previous_outputs = set(self.previous) if previous_outputs is None else set(previous_outputs)
+        self.edges = {}
+        # (outputs, reason) for each group recorded, reason None if kept
+        self.decisions = []
+
+    def check(self, outputs, inputs):
+        """Return why outputs need rebuilding from inputs, or None if they are up to date"""
+        for output in outputs:
+            old = self.previous.get(output)
+            if old is None:
+                return "new output"
+            if not (self.output_dir / output).exists():
+                return "output missing"
+            changed = sorted(name for name in old.keys() | inputs.keys() if old.get(name) != inputs.get(name))
+            if changed:
+                named = ", ".join(changed[:EXPLAIN_INPUTS])
+                if len(changed) > EXPLAIN_INPUTS:
+                    named += f" and {len(changed) - EXPLAIN_INPUTS} more"
+                return f"changed: {named}"
+        return None
+
+    def record(self, outputs, inputs, reason):
+        """Remember the inputs of outputs, and whether (and why) they were rebuilt"""
+        for output in outputs:
+            self.edges[output] = inputs
+        if outputs:
+            self.decisions.append((outputs, reason))
+
+    def removed(self):
+        """Outputs of the previous build that nothing produces any more"""
+        return sorted(self.previous_outputs - self.edges.keys())
+
+    def explain(self):
+        """Lines describing what was rebuilt and why"""
+        lines = []
+        kept = 0
+        for outputs, reason in self.decisions:
+            if reason is None:
+                kept += len(outputs)
+            else:
+                lines.append(f"{', '.join(outputs)}: {reason}")
+        inputs = {name for names in self.edges.values() for name in names}
+        lines.append(f"{len(self.edges) - kept} output(s) rebuilt, {kept} up to date, "
+                     f"{len(inputs)} input(s) tracked")
+        return lines
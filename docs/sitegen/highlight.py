@@ -0,0 +1,112 @@
+"""
+Persistent cache of Pygments-highlighted code blocks.
+Entries are keyed by the code block's language, formatter options, the
+Pygments version, and a hash of its source, and stored one file each under
+the build cache. Least recently used entries are evicted once the cache
+grows past its size limit. The Markdown extension that consults the cache
+is in sitegen.highlight_extension, so this module loads without Markdown
+or Pygments.
+"""
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+# The cache used by every engine in this process, set with use_cache()
+_active_cache = None
+
+
+class HighlightCache:
+    """Size-bounded LRU cache of highlighted HTML, in memory and on disk"""
+
+    def __init__(self, directory, max_bytes=32 * 1024 * 1024, stats=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.html"
+
+    def get(self, key):
+        """Return the cached HTML for a key, or None"""
+        html = self.memory.get(key)
+        if html is not None:
+            self.memory.move_to_end(key)
+            return html
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+        except OSError:
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._remember(key, html)
+        return html
+
+    def put(self, key, html):
+        """Store highlighted HTML in memory and on disk"""
+        self._remember(key, html)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key, html):
+        self.memory[key] = html
+        self.memory_bytes += len(html)
+        while self.memory_bytes > self.max_bytes and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its limit
+
+        Returns the number of entries removed.
+        """
+        if not self.directory.exists():
+            return 0
+
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.html"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self.memory.pop(path.stem, None)
+            total -= size
+            removed += 1
+        return removed
+
+
+def use_cache(cache):
+    """Make every Markdown engine in this process use a highlight cache"""
+    global _active_cache
+    _active_cache = cache
+
+
+def active_cache():
+    """The cache set with use_cache(), or None"""
+    return _active_cache
@@ -0,0 +1,96 @@
+"""
+Markdown extension that routes code highlighting through the active
+sitegen.highlight cache. Loaded by name ('sitegen.highlight_extension')
+when the first Markdown engine is built. Only the engines that load it use
+the cache; other Markdown instances in the process highlight as usual.
+"""
+
+import functools
+import hashlib
+import time
+from contextlib import contextmanager
+
+import pygments
+from markdown.extensions import Extension
+from markdown.extensions import codehilite, fenced_code
+
+from sitegen.highlight import active_cache
+
+_OriginalCodeHilite = codehilite.CodeHilite
+
+
+class CachingCodeHilite(_OriginalCodeHilite):
+    """CodeHilite that looks blocks up in the active HighlightCache first"""
+
+    def cache_key(self, shebang):
+        options = repr(sorted(self.options.items()))
+        key = "\0".join([
+            pygments.__version__,
+            repr(self.lang),
+            repr(self.guess_lang),
+            repr(self.use_pygments),
+            self.lang_prefix,
+            repr(self.pygments_formatter),
+            options,
+            repr(shebang),
+            self.src,
+        ])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def hilite(self, shebang=True):
+        cache = active_cache()
+        if cache is None:
+            return super().hilite(shebang)
+
+        key = self.cache_key(shebang)
+        html = cache.get(key)
+        if html is not None:
+            if cache.stats is not None:
+                cache.stats.highlight_hits += 1
+            return html
+
+        start = time.perf_counter()
+        html = super().hilite(shebang)
+        if cache.stats is not None:
+            cache.stats.highlight_misses += 1
+            cache.stats.highlight_time += time.perf_counter() - start
+        cache.put(key, html)
+        return html
+
+
+@contextmanager
+def caching_code_hilite():
+    """Make codehilite and fenced_code build CachingCodeHilite until exit"""
+    codehilite.CodeHilite = fenced_code.CodeHilite = CachingCodeHilite
+    try:
+        yield
+    finally:
+        codehilite.CodeHilite = fenced_code.CodeHilite = _OriginalCodeHilite
+
+
+class HighlightCacheExtension(Extension):
+    """Route codehilite and fenced_code highlighting through the cache
+
+    Both extensions look CodeHilite up as a module global when they render
+    a block, so this engine's highlighting processors swap in
+    CachingCodeHilite while they run, covering fenced and indented code
+    alike. List this extension after codehilite and fenced_code.
+    """
+
+    def extendMarkdown(self, md):
+        for registry, name in ((md.treeprocessors, 'hilite'), (md.preprocessors, 'fenced_code_block')):
+            if name in registry:
+                processor = registry[name]
+                processor.run = self.cached(processor.run)
+
+    @staticmethod
+    def cached(run):
+        @functools.wraps(run)
+        def run_with_cache(*args):
+            with caching_code_hilite():
+                return run(*args)
+        return run_with_cache
+
+
+def makeExtension(**kwargs):
+    return HighlightCacheExtension(**kwargs)
@@ -0,0 +1,74 @@
+"""
+SVG icons drawn on every page, served as one shared sprite.
+Each icon is a <symbol> in icons/sprite.<hash>.svg, and pages draw it
+with <svg><use href="...#name"></use></svg>, so its path data is
+downloaded once and cached instead of repeated for every post listed. The
+sprite is named after its contents like a fingerprinted asset, so it can
+be served as immutable.
+"""
+
+import posixpath
+
+from sitegen.fingerprint import FINGERPRINTED_RE, fingerprinted_name
+from sitegen.manifest import hash_bytes
+
+# Icon name -> (viewBox, path data)
+ICONS = {
+    "calendar": (
+        "0 0 448 512",
+        "M148 288h-40c-6.6 0-12-5.4-12-12v-40c0-6.6 5.4-12 12-12h40c6.6 0 12 5.4 12 12v40c0 6.6-5.4 12-12 12zm108-12v-40c0-6.6-5.4-12-12-12h-40c-6.6 0-12 5.4-12 12v40c0 6.6 5.4 12 12 12h40c6.6 0 12-5.4 12-12zm96 0v-40c0-6.6-5.4-12-12-12h-40c-6.6 0-12 5.4-12 12v40c0 6.6 5.4 12 12 12h40c6.6 0 12-5.4 12-12zm-96 96v-40c0-6.6-5.4-12-12-12h-40c-6.6 0-12 5.4-12 12v40c0 6.6 5.4 12 12 12h40c6.6 0 12-5.4 12-12zm-96 0v-40c0-6.6-5.4-12-12-12h-40c-6.6 0-12 5.4-12 12v40c0 6.6 5.4 12 12 12h40c6.6 0 12-5.4 12-12zm192 0v-40c0-6.6-5.4-12-12-12h-40c-6.6 0-12 5.4-12 12v40c0 6.6 5.4 12 12 12h40c6.6 0 12-5.4 12-12zm96-260v352c0 26.5-21.5 48-48 48H48c-26.5 0-48-21.5-48-48V112c0-26.5 21.5-48 48-48h48V12c0-6.6 5.4-12 12-12h40c6.6 0 12 5.4 12 12v52h128V12c0-6.6 5.4-12 12-12h40c6.6 0 12 5.4 12 12v52h48c26.5 0 48 21.5 48 48zm-48 346V160H48v298c0 3.3 2.7 6 6 6h340c3.3 0 6-2.7 6-6z",
+    ),
+    "archive": (
+        "0 0 512 512",
+        "M32 32C14.3 32 0 46.3 0 64s14.3 32 32 32h32v32H32C14.3 128 0 142.3 0 160s14.3 32 32 32h32v32H32C14.3 224 0 238.3 0 256s14.3 32 32 32h32v32H32C14.3 320 0 334.3 0 352s14.3 32 32 32h32v32H32C14.3 416 0 430.3 0 448s14.3 32 32 32h448c17.7 0 32-14.3 32-32s-14.3-32-32-32h-32v-32h32c17.7 0 32-14.3 32-32s-14.3-32-32-32h-32v-32h32c17.7 0 32-14.3 32-32s-14.3-32-32-32h-32v-32h32c17.7 0 32-14.3 32-32s-14.3-32-32-32h-32V96h32c17.7 0 32-14.3 32-32s-14.3-32-32-32H32zM96 96h320v320H96V96z",
+    ),
+    "user-circle": (
+        "0 0 496 512",
+        "M248 8C111 8 0 119 0 256s111 248 248 248 248-111 248-248S385 8 248 8zm0 96c48.6 0 88 39.4 88 88s-39.4 88-88 88-88-39.4-88-88 39.4-88 88-88zm0 344c-58.7 0-111.3-26.6-146.5-68.2 18.8-35.4 55.6-59.8 98.5-59.8 2.4 0 4.8.4 7.1 1.1 13 4.2 26.6 6.9 40.9 6.9 14.3 0 28-2.7 40.9-6.9 2.3-.7 4.7-1.1 7.1-1.1 42.9 0 79.7 24.4 98.5 59.8C359.3 421.4 306.7 448 248 448z",
+    ),
+    "arrow-up": (
+        "0 0 448 512",
+        "M34.9 289.5l-22.2-22.2c-9.4-9.4-9.4-24.6 0-33.9L207 39c9.4-9.4 24.6-9.4 33.9 0l194.3 194.3c9.4 9.4 9.4 24.6 0 33.9L413 289.4c-9.5 9.5-25 9.3-34.3-.4L264 168.6V456c0 13.3-10.7 24-24 24h-32c-13.3 0-24-10.7-24-24V168.6L69.2 289.1c-9.3 9.8-24.8 10-34.3.4z",
+    ),
+}
+
+SPRITE_PATH = "icons/sprite.svg"
+
+
+def sprite_svg(icons):
+    """An SVG document with one <symbol> per icon"""
+    symbols = "".join(f'<symbol id="{name}" viewBox="{view_box}"><path d="{path}"/></symbol>\n'
+                      for name, (view_box, path) in icons.items())
+    return f'<svg xmlns="http://www.w3.org/2000/svg">\n{symbols}</svg>\n'
+
+
+class IconSprite:
+    """The sprite's contents, where it is written, and markup that uses it"""
+
+    def __init__(self, icons=ICONS):
+        self.icons = icons
+        self.data = sprite_svg(icons).encode('utf-8')
+        # Path relative to the output directory
+        self.path = fingerprinted_name(SPRITE_PATH, hash_bytes(self.data))
+        self.url = "/" + self.path
+
+    def icon(self, name, css_class):
+        """Markup drawing one icon from the sprite"""
+        view_box = self.icons[name][0]
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{view_box}" class="{css_class}" '
+                f'aria-hidden="true"><use href="{self.url}#{name}"></use></svg>')
+
+    def write(self, output_dir, writer):
+        """Write the sprite, deleting sprites left from other contents
+
+        Returns the number of old sprites removed.
+        """
+        path = output_dir / self.path
+        writer.write_bytes(path, self.data)
+        removed = 0
+        stem, suffix = posixpath.splitext(posixpath.basename(SPRITE_PATH))
+        for old in path.parent.glob(f"{stem}.*{suffix}"):
+            if old != path and FINGERPRINTED_RE.search(old.name):
+                old.unlink()
+                removed += 1
+        return removed
@@ -0,0 +1,216 @@
+"""
+Responsive image variants for the PNG and JPEG images posts embed.
+Each image is resized to a set of widths and encoded as AVIF and WebP
+(whichever the installed Pillow supports). Variant file names carry a hash
+of the source, so a variant is only generated when its source changes.
+Rendered <img> tags are rewritten into <picture> elements with srcset,
+width, and height. Needs Pillow; without it images are left as they are.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from sitegen.fingerprint import FINGERPRINTED_RE
+from sitegen.manifest import hash_file, hash_json
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+WIDTHS = (480, 960, 1440)
+# Standard widths this close below an image's own width add nothing over it
+WIDTH_GAP = 0.1
+SOURCE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+VARIANT_DIR = "img-variants"
+
+# Encoder settings per format, in the order <source> elements are listed
+ENCODERS = {
+    "avif": {"quality": 60},
+    "webp": {"quality": 80, "method": 6},
+}
+
+_IMG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_SRC_RE = re.compile(r'\ssrc="([^"]+)"')
+
+
+def available_formats():
+    """Variant formats the installed Pillow can encode"""
+    if Image is None:
+        return []
+    return [name for name in ENCODERS if features.check(name)]
+
+
+class ResponsiveImage:
+    """An image's intrinsic size and its variants, as (format, width, URL)"""
+
+    __slots__ = ('width', 'height', 'variants')
+
+    def __init__(self, width, height, variants):
+        self.width = width
+        self.height = height
+        self.variants = variants
+
+    def srcset(self, image_format):
+        return ", ".join(f"{url} {width}w" for name, width, url in self.variants if name == image_format)
+
+
+def variant_widths(width):
+    """Widths to generate for an image; images are never scaled up
+
+    The image's own width is always included, and standard widths within
+    WIDTH_GAP of it are skipped, so a 1444px image gets no 1440w variant.
+    """
+    return [w for w in WIDTHS if w < width * (1 - WIDTH_GAP)] + [width]
+
+
+def _generate_variant(source, target, width, image_format):
+    """Resize and encode one variant; runs in a worker process"""
+    with Image.open(source) as image:
+        # Convert palette and greyscale images first so resizing can filter
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+        if image.width != width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        image.save(tmp_path, format=image_format.upper(), **ENCODERS[image_format])
+    os.replace(tmp_path, target)
+    return target.stat().st_size
+
+
+class ImagePipeline:
+    """Builds and remembers the variants of every image under an output directory"""
+
+    def __init__(self, output_dir, cache_dir, image_dir="img", workers=None):
+        self.output_dir = Path(output_dir)
+        self.image_dir = image_dir
+        self.index_path = Path(cache_dir) / "images.json"
+        self.workers = workers
+        self.images = {}
+        self.generated = 0
+        self.reused = 0
+        self.removed = 0
+        self.bytes_written = 0
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f".{self.index_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _source_info(self, path, rel_path, previous):
+        """Hash and measure a source image, reusing the index when its stat matches"""
+        stat = path.stat()
+        entry = previous.get(rel_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry
+        with Image.open(path) as image:
+            width, height = image.size
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': hash_file(path),
+            'width': width,
+            'height': height,
+        }
+
+    def build(self):
+        """Generate missing variants and drop ones no longer needed
+
+        Returns a digest of the image map, which changes whenever the
+        rewritten <img> tags would.
+        """
+        formats = available_formats()
+        source_root = self.output_dir / self.image_dir
+        variant_root = self.output_dir / VARIANT_DIR
+        previous = self._load_index()
+        index = {}
+        jobs = []
+        wanted = set()
+
+        # Fingerprinted copies of images are outputs, not more sources
+        sources = sorted(path for path in source_root.rglob("*")
+                         if path.suffix.lower() in SOURCE_SUFFIXES and path.is_file()
+                         and not FINGERPRINTED_RE.search(path.name)) if source_root.exists() else []
+        for path in sources:
+            rel_path = path.relative_to(source_root).as_posix()
+            info = self._source_info(path, rel_path, previous)
+            index[rel_path] = info
+
+            stem = rel_path.rsplit(".", 1)[0].replace("/", "--")
+            variants = []
+            for image_format in formats:
+                for width in variant_widths(info['width']):
+                    name = f"{stem}.{info['hash'][:12]}.{width}w.{image_format}"
+                    target = variant_root / name
+                    wanted.add(name)
+                    variants.append((image_format, width, f"/{VARIANT_DIR}/{name}"))
+                    if target.exists():
+                        self.reused += 1
+                    else:
+                        jobs.append((path, target, width, image_format))
+            self.images[f"/{self.image_dir}/{rel_path}"] = ResponsiveImage(info['width'], info['height'], variants)
+
+        if jobs:
+            variant_root.mkdir(parents=True, exist_ok=True)
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(_generate_variant, *job) for job in jobs]
+                for future in futures:
+                    self.bytes_written += future.result()
+                    self.generated += 1
+
+        if variant_root.exists():
+            for path in variant_root.iterdir():
+                if path.name not in wanted:
+                    path.unlink()
+                    self.removed += 1
+
+        self._save_index(index)
+        return hash_json({
+            'formats': formats,
+            'widths': WIDTHS,
+            'width_gap': WIDTH_GAP,
+            'images': {path: [info['hash'], info['width'], info['height']] for path, info in index.items()},
+        })
+
+    def rewrite(self, html):
+        """Turn <img> tags for known images into <picture> elements"""
+        if not self.images:
+            return html
+        return _IMG_RE.sub(self._rewrite_tag, html)
+
+    def _rewrite_tag(self, match):
+        tag = match.group()
+        src = _SRC_RE.search(tag)
+        image = self.images.get(src.group(1)) if src else None
+        if image is None or not image.variants or "srcset=" in tag:
+            return tag
+
+        attributes = ""
+        if " width=" not in tag:
+            attributes += f' width="{image.width}"'
+        if " height=" not in tag:
+            attributes += f' height="{image.height}"'
+        img = re.sub(r"\s*/?>$", f"{attributes} />", tag)
+
+        sizes = f"(max-width: {image.width}px) 100vw, {image.width}px"
+        sources = "".join(f'<source type="image/{image_format}" srcset="{image.srcset(image_format)}" sizes="{sizes}" />'
+                          for image_format in ENCODERS if image.srcset(image_format))
+        return f"<picture>{sources}{img}</picture>"
+
+    def summary(self):
+        return (f"{len(self.images)} image(s): {self.generated} variant(s) generated "
+                f"({self.bytes_written / 1024:.0f} KB), {self.reused} reused, {self.removed} removed")
+
@@ -0,0 +1,204 @@
+"""
+On-disk build manifest used for incremental builds.
+Records source hashes, the builder config fingerprint, the post metadata
+(including its summary and word count) each source produced last time it
+was converted, and the dependency graph of every output.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+MANIFEST_VERSION = 3
+
+# Reading speed behind each post's reading time
+WORDS_PER_MINUTE = 200
+
+
+def hash_bytes(data):
+    """Return the hex SHA-256 digest of some bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Return the hex SHA-256 digest of a file's contents"""
+    with open(path, 'rb') as f:
+        return hash_bytes(f.read())
+
+
+def hash_json(value):
+    """Return a stable digest of a JSON-serialisable value"""
+    return hash_bytes(json.dumps(value, sort_keys=True).encode('utf-8'))
+
+
+class PostRecord:
+    """What the index and archive pages need to know about one post
+
+    Records for every post stay in memory for the whole build, so they use
+    slots instead of a dict; item access keeps them usable like one.
+    """
+
+    __slots__ = ('title', 'date', 'slug', 'summary', 'word_count')
+
+    def __init__(self, title, date, slug, summary, word_count=0):
+        self.title = title
+        self.date = date
+        self.slug = slug
+        self.summary = summary
+        self.word_count = word_count
+
+    @property
+    def reading_time(self):
+        """Estimated minutes to read the post, at least one"""
+        return max(1, -(-self.word_count // WORDS_PER_MINUTE))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def keys(self):
+        return self.__slots__
+
+    def __eq__(self, other):
+        return isinstance(other, PostRecord) and all(self[key] == other[key] for key in self.__slots__)
+
+    def __repr__(self):
+        return f"PostRecord({', '.join(f'{key}={self[key]!r}' for key in self.__slots__)})"
+
+
+def encode_record(record):
+    """Make a post record JSON-serialisable, keeping the date's type"""
+    encoded = dict(record)
+    value = record['date']
+    if isinstance(value, datetime):
+        encoded['date'] = {'datetime': value.isoformat()}
+    elif isinstance(value, date):
+        encoded['date'] = {'date': value.isoformat()}
+    else:
+        encoded['date'] = {'str': str(value)}
+    return encoded
+
+
+def decode_record(encoded):
+    """Inverse of encode_record()"""
+    record = dict(encoded)
+    (kind, value), = encoded['date'].items()
+    if kind == 'datetime':
+        record['date'] = datetime.fromisoformat(value)
+    elif kind == 'date':
+        record['date'] = date.fromisoformat(value)
+    else:
+        record['date'] = value
+    return PostRecord(**record)
+
+
+class BuildManifest:
+    """Source hashes and outputs from the previous build"""
+
+    def __init__(self, path, data=None):
+        self.path = Path(path)
+        self.data = data or {
+            'version': MANIFEST_VERSION,
+            'config': None,
+            'posts': {},
+            'pages': {},
+            'graph': {},
+        }
+        # (mtime, size) of the file when this manifest was loaded or saved
+        self.disk_stat = None
+
+    @classmethod
+    def load(cls, path):
+        """Load a manifest, returning an empty one if it is missing or stale"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(path)
+        manifest = cls(path, data)
+        manifest.disk_stat = manifest._stat()
+        return manifest
+
+    def _stat(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def unchanged_on_disk(self):
+        """True if the file still holds what this manifest last loaded or saved"""
+        return self.disk_stat is not None and self.disk_stat == self._stat()
+
+    def save(self):
+        """Atomically write the manifest back to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.disk_stat = self._stat()
+
+    def invalidate_if_changed(self, config):
+        """Drop every recorded entry if the builder config changed
+
+        Returns True if the previous build can no longer be trusted.
+        Changes to the template and other shared inputs are tracked per
+        output by the dependency graph instead.
+        """
+        if self.data['config'] == config:
+            return False
+        self.data['config'] = config
+        self.data['posts'] = {}
+        self.data['pages'] = {}
+        self.data['graph'] = {}
+        return True
+
+    def _outputs_exist(self, output_dir, outputs):
+        return all((output_dir / output).exists() for output in outputs)
+
+    def post_entry(self, key):
+        """Return what a post source produced last time, or None"""
+        return self.data['posts'].get(key)
+
+    def record_post(self, key, source_hash, record, outputs):
+        """Remember what a post source produced
+
+        The record is None for drafts, which produce no outputs.
+        """
+        self.data['posts'][key] = {
+            'hash': source_hash,
+            'record': encode_record(record) if record is not None else None,
+            'outputs': sorted(outputs),
+        }
+
+    def post_keys(self):
+        return list(self.data['posts'])
+
+    def forget_post(self, key):
+        """Remove a post whose source has gone"""
+        del self.data['posts'][key]
+
+    def fresh_page(self, name, key, output_dir):
+        """Return True if a generated page's inputs are unchanged"""
+        entry = self.data['pages'].get(name)
+        if entry is None or entry['key'] != key:
+            return False
+        return self._outputs_exist(output_dir, entry['outputs'])
+
+    def graph_edges(self):
+        """The dependency graph of the previous build, as {output: {input: digest}}"""
+        return self.data['graph']
+
+    def record_graph(self, edges):
+        self.data['graph'] = edges
+
+    def record_page(self, name, key, outputs):
+        """Remember a generated page"""
+        self.data['pages'][name] = {'key': key, 'outputs': sorted(outputs)}
@@ -0,0 +1,132 @@
+"""
+Conservative HTML and CSS minification, and page size budgets.
+Whitespace is collapsed rather than removed, so inline layout is unchanged,
+and the contents of <pre>, <code>, <textarea>, and <script> are kept byte
+for byte.
+"""
+
+import re
+
+# Elements whose contents must survive untouched; <style> is minified as CSS
+_HTML_TOKEN_RE = re.compile(
+    r"(?P<raw><(?P<tag>pre|code|textarea|script)\b[^>]*>.*?</(?P=tag)\s*>)"
+    r"|(?P<style><style\b[^>]*>)(?P<css>.*?)(?P<style_end></style\s*>)"
+    r"|(?P<comment><!--.*?-->)"
+    r"|(?P<element><[^>]+>)",
+    re.IGNORECASE | re.DOTALL,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+# Whitespace inside a tag, outside its quoted attribute values
+_TAG_WHITESPACE_RE = re.compile(r"(\"[^\"]*\"|'[^']*')|\s+")
+# Whitespace before the > that ends a tag; " />" is kept, since an unquoted
+# attribute value would run into the slash
+_TAG_END_RE = re.compile(r"\s+>$")
+
+_CSS_TOKEN_RE = re.compile(
+    r"(?P<string>\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')"
+    r"|(?P<comment>/\*.*?\*/)"
+    r"|(?P<space>\s+)",
+    re.DOTALL,
+)
+# Whitespace next to these characters never matters in CSS
+_CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,])\s*")
+
+
+def _collapse_text(text):
+    """Collapse each whitespace run to one space, or a newline if it had one"""
+    return _WHITESPACE_RE.sub(lambda m: "\n" if "\n" in m.group() else " ", text)
+
+
+def _minify_tag(tag):
+    tag = _TAG_WHITESPACE_RE.sub(lambda m: m.group(1) or " ", tag)
+    return _TAG_END_RE.sub(">", tag)
+
+
+def minify_html(html, replacements=None):
+    """Minify an HTML document
+
+    Comments other than conditional comments are dropped, whitespace runs
+    in text and between attributes are collapsed, and inline CSS is
+    minified. replacements maps exact attribute values (such as stylesheet
+    URLs) to the values to use instead.
+    """
+    out = []
+    # Text between tokens, held back so that text on either side of a
+    # dropped comment collapses as one run
+    text = []
+    position = 0
+    for match in _HTML_TOKEN_RE.finditer(html):
+        text.append(html[position:match.start()])
+        position = match.end()
+        if match.group("comment") and not match.group("comment").startswith("<!--[if"):
+            continue
+
+        out.append(_collapse_text("".join(text)))
+        text = []
+        if match.group("raw") or match.group("comment"):
+            out.append(match.group())
+        elif match.group("style"):
+            out.append(_minify_tag(match.group("style")))
+            out.append(minify_css(match.group("css")))
+            out.append(match.group("style_end"))
+        else:
+            tag = _minify_tag(match.group("element"))
+            if replacements:
+                for old, new in replacements.items():
+                    tag = tag.replace(f'"{old}"', f'"{new}"')
+            out.append(tag)
+    text.append(html[position:])
+    out.append(_collapse_text("".join(text)))
+    return "".join(out).strip() + "\n"
+
+
+def minify_css(css):
+    """Minify a stylesheet
+
+    Comments are dropped except /*! ... */ licence comments, whitespace is
+    collapsed, and the space around braces, semicolons, and commas and the
+    last semicolon in each block are removed. Strings are kept as is.
+    """
+    parts = []
+    out = []
+    position = 0
+    for match in _CSS_TOKEN_RE.finditer(css):
+        out.append(css[position:match.start()])
+        position = match.end()
+        if match.group("string"):
+            # Protect strings from the punctuation pass below
+            parts.append(match.group("string"))
+            out.append(f"\0{len(parts) - 1}\0")
+        elif match.group("comment"):
+            if match.group("comment").startswith("/*!"):
+                parts.append(match.group("comment"))
+                out.append(f"\0{len(parts) - 1}\0")
+        else:
+            out.append(" ")
+    out.append(css[position:])
+
+    minified = _CSS_PUNCTUATION_RE.sub(r"\1", "".join(out))
+    minified = re.sub(r":\s+", ":", minified)
+    minified = minified.replace(";}", "}").strip()
+    return re.sub(r"\0(\d+)\0", lambda m: parts[int(m.group(1))], minified)
+
+
+class BudgetReport:
+    """Pages larger than a byte budget"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.checked = 0
+        self.over = []
+
+    def check(self, name, size):
+        self.checked += 1
+        if size > self.budget:
+            self.over.append((name, size))
+
+    def summary(self):
+        lines = [f"{self.checked} page(s) checked against a {self.budget / 1024:.0f} KB budget, "
+                 f"{len(self.over)} over"]
+        for name, size in sorted(self.over, key=lambda item: item[1], reverse=True):
+            lines.append(f"{name}: {size / 1024:.1f} KB ({(size - self.budget) / 1024:.1f} KB over)")
+        return lines
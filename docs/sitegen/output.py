@@ -0,0 +1,138 @@
+"""
+Atomic, change-aware writing of build outputs.
+Files are only replaced when their bytes actually change, so unchanged
+outputs keep their mtimes for rsync and CDN invalidation.
+"""
+
+import os
+from pathlib import Path
+
+LINK_MODES = ("copy", "hardlink", "symlink")
+
+
+class OutputWriter:
+    """Writes outputs via a temporary file and rename, skipping identical ones"""
+
+    def __init__(self, compat_links="copy"):
+        if compat_links not in LINK_MODES:
+            raise ValueError(f"compat_links must be one of {', '.join(LINK_MODES)}, not {compat_links!r}")
+        self.compat_links = compat_links
+        self.written = 0
+        self.unchanged = 0
+
+    def _tmp_path(self, path):
+        return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    def _same_contents(self, path, data):
+        try:
+            if path.is_symlink() or path.stat().st_size != len(data):
+                return False
+            with open(path, 'rb') as f:
+                return f.read() == data
+        except OSError:
+            return False
+
+    def write_text(self, path, text):
+        """Write text as UTF-8; returns True if the file changed"""
+        return self.write_bytes(path, text.encode('utf-8'))
+
+    def write_bytes(self, path, data):
+        """Write bytes atomically; returns True if the file changed"""
+        path = Path(path)
+        if self._same_contents(path, data):
+            self.unchanged += 1
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_path(path)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.written += 1
+        return True
+
+    def write_chunks(self, path, chunks):
+        """Write text chunks as UTF-8 without joining them; returns True if the file changed
+
+        The chunks are compared against the existing file as they are
+        written, so memory use doesn't depend on the file's size.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_path(path)
+        try:
+            existing = None if path.is_symlink() else open(path, 'rb')
+        except OSError:
+            existing = None
+        same = existing is not None
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    data = chunk.encode('utf-8')
+                    f.write(data)
+                    if same and existing.read(len(data)) != data:
+                        same = False
+            if same and existing.read(1):
+                same = False
+        finally:
+            if existing is not None:
+                existing.close()
+
+        if same:
+            os.unlink(tmp_path)
+            self.unchanged += 1
+            return False
+        os.replace(tmp_path, path)
+        self.written += 1
+        return True
+
+    def write_compat(self, target, path, data):
+        """Make path a second copy of target, which already holds data
+
+        Depending on compat_links this writes the bytes again, hardlinks
+        path to target, or makes it a relative symlink to target.
+        """
+        path = Path(path)
+        target = Path(target)
+        if self.compat_links == "copy":
+            return self.write_bytes(path, data)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_path(path)
+        if self.compat_links == "hardlink":
+            try:
+                if not path.is_symlink() and os.path.samefile(path, target):
+                    self.unchanged += 1
+                    return False
+            except OSError:
+                pass
+            os.link(target, tmp_path)
+        else:
+            link_target = os.path.relpath(target, path.parent)
+            if path.is_symlink() and os.readlink(path) == link_target:
+                self.unchanged += 1
+                return False
+            os.symlink(link_target, tmp_path)
+
+        os.replace(tmp_path, path)
+        self.written += 1
+        return True
+
+    def summary(self):
+        return f"wrote {self.written} file(s), {self.unchanged} unchanged"
+
+
+def walk_outputs(root, exclude=()):
+    """Yield (directory, file name) under root, skipping dot directories and exclude
+
+    exclude holds paths relative to root (files or directories).
+    """
+    exclude = {os.path.normpath(path) for path in exclude}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        dirnames[:] = [name for name in dirnames
+                       if not name.startswith(".")
+                       and os.path.normpath(os.path.join(rel_dir, name)) not in exclude]
+        for name in filenames:
+            if os.path.normpath(os.path.join(rel_dir, name)) not in exclude:
+                yield dirpath, name
@@ -0,0 +1,70 @@
+"""
+Markdown preprocessing done before and after conversion.
+Reference-link definitions are pulled out in a single pass over the
+lines that also tracks code fences, and substituted back into the HTML
+with one alternation regex instead of one re.sub() per reference.
+"""
+
+import re
+
+REF_LINK_RE = re.compile(r'^\[(?!\^)([^\]]+)\]:\s*(.+)$')
+
+
+def preprocess(content):
+    """Strip reference-link definitions that sit outside code fences
+
+    Whitespace-only lines outside fences are emptied so they read as
+    paragraph breaks. Returns (content, ref_links) where ref_links maps
+    each reference name to its URL.
+    """
+    ref_links = {}
+    processed_lines = []
+    in_code_block = False
+    code_block_delimiter = None
+
+    for line in content.split('\n'):
+        stripped = line.strip()
+
+        # Check if we're entering or exiting a code block
+        if stripped.startswith('```'):
+            if not in_code_block:
+                in_code_block = True
+                code_block_delimiter = stripped
+            elif stripped == code_block_delimiter:
+                in_code_block = False
+                code_block_delimiter = None
+            processed_lines.append(line)
+            continue
+
+        if not in_code_block:
+            match = REF_LINK_RE.match(stripped)
+            if match:
+                # Store the reference link and drop its definition
+                ref_links[match.group(1)] = match.group(2).strip()
+                continue
+            if not stripped:
+                line = ''
+
+        processed_lines.append(line)
+
+    return '\n'.join(processed_lines), ref_links
+
+
+def _reference_pattern(ref_links):
+    return re.compile(r'\[(' + '|'.join(re.escape(name) for name in ref_links) + r')\]')
+
+
+def substitute_reference_links(html, ref_links):
+    """Replace each [ref_name] left in the HTML with a link to its URL"""
+    if not ref_links:
+        return html
+
+    pattern = _reference_pattern(ref_links)
+    return pattern.sub(lambda match: f'<a href="{ref_links[match.group(1)]}">{match.group(1)}</a>', html)
+
+
+def substitute_reference_text(text, ref_links):
+    """Replace each [ref_name] left in plain text with the name alone"""
+    if not ref_links:
+        return text
+    return _reference_pattern(ref_links).sub(r'\1', text)
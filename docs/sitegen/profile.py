@@ -0,0 +1,158 @@
+"""
+Build profiling: per-stage and per-post timings plus peak memory.
+The report is printed as sorted tables and saved as a Chrome trace
+(load it in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+POST_PHASES = ("read", "frontmatter", "preprocess", "markdown", "highlight", "template", "write")
+
+
+class PhaseTimer:
+    """Times consecutive phases of rendering one post"""
+
+    __slots__ = ('phases', 'last')
+
+    def __init__(self):
+        self.phases = []
+        self.last = time.perf_counter()
+
+    def mark(self, name):
+        """End the current phase, naming it"""
+        now = time.perf_counter()
+        self.phases.append((name, self.last, now - self.last))
+        self.last = now
+
+    def split(self, name, part_name, part_duration):
+        """Like mark(), but attribute part of the phase to another name
+
+        Highlighting happens inside Markdown conversion, so its time is
+        carved out of the markdown phase.
+        """
+        now = time.perf_counter()
+        total = now - self.last
+        part_duration = min(part_duration, total)
+        self.phases.append((name, self.last, total - part_duration))
+        self.phases.append((part_name, now - part_duration, part_duration))
+        self.last = now
+
+
+class BuildProfiler:
+    """Collects stage and post timings for one build"""
+
+    def __init__(self, trace_path):
+        self.trace_path = Path(trace_path)
+        self.stages = []
+        self.posts = {}
+        self.events = []
+        self.pid = os.getpid()
+        self.start = time.perf_counter()
+        self.peak_memory = None
+
+    def __enter__(self):
+        import tracemalloc
+        tracemalloc.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        import tracemalloc
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._event("build", self.start, time.perf_counter() - self.start, self.pid)
+        return False
+
+    def _event(self, name, start, duration, pid, category="stage"):
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.start) * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": pid,
+        })
+
+    @contextmanager
+    def stage(self, name):
+        """Time a build stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.stages.append((name, duration))
+            self._event(name, start, duration, self.pid)
+
+    def add_post(self, name, phases, pid=None):
+        """Record the phases of one post, as collected by a PhaseTimer"""
+        totals = self.posts.setdefault(name, dict.fromkeys(POST_PHASES, 0.0))
+        for phase, start, duration in phases:
+            totals[phase] = totals.get(phase, 0.0) + duration
+            self._event(phase, start, duration, pid or self.pid, category=name)
+
+    def report(self, top=15):
+        """Print stage and post tables, slowest first, and save the trace"""
+        print("Build profile:")
+        print(f"  {'stage':<24}{'ms':>10}")
+        for name, duration in sorted(self.stages, key=lambda stage: stage[1], reverse=True):
+            print(f"  {name:<24}{duration * 1000:>10.1f}")
+
+        if self.posts:
+            rows = sorted(self.posts.items(), key=lambda item: sum(item[1].values()), reverse=True)
+            header = "".join(f"{phase:>12}" for phase in POST_PHASES)
+            print(f"\n  {'post (ms)':<40}{header}{'total':>10}")
+            for name, phases in rows[:top]:
+                cells = "".join(f"{phases[phase] * 1000:>12.1f}" for phase in POST_PHASES)
+                print(f"  {name[:39]:<40}{cells}{sum(phases.values()) * 1000:>10.1f}")
+            if len(rows) > top:
+                print(f"  ... {len(rows) - top} more in {self.trace_path}")
+            totals = "".join(f"{sum(p[phase] for p in self.posts.values()) * 1000:>12.1f}"
+                             for phase in POST_PHASES)
+            print(f"  {'all posts':<40}{totals}")
+
+        if self.peak_memory is not None:
+            print(f"\n  Peak traced memory (main process): {self.peak_memory / 1024 / 1024:.1f} MB")
+
+        self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.trace_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "traceEvents": self.events,
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "stages": dict(self.stages),
+                    "posts": self.posts,
+                    "peak_memory_bytes": self.peak_memory,
+                },
+            }, f)
+        print(f"  Chrome trace written to {self.trace_path}")
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off"""
+
+    def stage(self, name):
+        return nullcontext()
+
+    def add_post(self, name, phases, pid=None):
+        pass
+
+
+class _NullTimer:
+    """PhaseTimer stand-in for callers that don't want timings"""
+
+    __slots__ = ()
+
+    def mark(self, name):
+        pass
+
+    def split(self, name, part_name, part_duration):
+        pass
+
+
+NULL_TIMER = _NullTimer()
@@ -0,0 +1,130 @@
+"""
+Markdown engines shared across every document rendered in a process.
+Building a markdown.Markdown instance loads and configures each extension,
+so each extension set is built once and reset() between documents.
+Markdown itself is only imported when the first engine is built, so builds
+that convert nothing never load it.
+"""
+
+import time
+
+from sitegen.highlight import HighlightCache, use_cache
+
+# Extension sets used by the builder, keyed by name
+ENGINE_CONFIGS = {
+    'post': {
+        'extensions': [
+            'markdown.extensions.fenced_code',
+            'markdown.extensions.tables',
+            'markdown.extensions.codehilite',
+            'markdown.extensions.toc',
+            'markdown.extensions.footnotes',
+            'markdown.extensions.def_list',
+            'markdown.extensions.attr_list',
+            'sitegen.highlight_extension',
+            'sitegen.summary_extension',
+            # Removed nl2br to prevent weird line breaks
+        ],
+        'extension_configs': {
+            'markdown.extensions.toc': {
+                'anchorlink': True,
+                'permalink': False,
+                'title': 'Permalink to this section'
+            },
+            'markdown.extensions.codehilite': {
+                'use_pygments': True,
+                'css_class': 'highlight',
+                'linenums': False
+            }
+        },
+    },
+    'about': {
+        'extensions': ['fenced_code', 'tables', 'codehilite', 'toc', 'nl2br', 'sitegen.highlight_extension'],
+        'extension_configs': {},
+    },
+}
+
+
+class RenderStats:
+    """Time spent building engines versus converting documents"""
+
+    __slots__ = ('engines', 'setup_time', 'documents', 'convert_time',
+                 'highlight_hits', 'highlight_misses', 'highlight_time')
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name, 0))
+
+    def copy(self):
+        return RenderStats(**{name: getattr(self, name) for name in self.__slots__})
+
+    def since(self, earlier):
+        """Return the work done since an earlier snapshot"""
+        return RenderStats(**{name: getattr(self, name) - getattr(earlier, name)
+                              for name in self.__slots__})
+
+    def add(self, other):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def summary(self):
+        return (f"built {self.engines} engine(s) in {self.setup_time * 1000:.1f} ms, "
+                f"converted {self.documents} document(s) in {self.convert_time * 1000:.1f} ms")
+
+    def highlight_summary(self):
+        return (f"{self.highlight_hits} cached, {self.highlight_misses} highlighted "
+                f"in {self.highlight_time * 1000:.1f} ms")
+
+
+class MarkdownRenderer:
+    """Pool of configured Markdown engines, one per extension set"""
+
+    def __init__(self, configs=ENGINE_CONFIGS):
+        self.configs = configs
+        self.engines = {}
+        self.stats = RenderStats()
+        self.highlight_cache = None
+
+    def use_highlight_cache(self, directory, max_bytes):
+        """Cache highlighted code blocks under a directory"""
+        cache = self.highlight_cache
+        if cache is None or cache.directory != directory or cache.max_bytes != max_bytes:
+            cache = HighlightCache(directory, max_bytes, stats=self.stats)
+            self.highlight_cache = cache
+        use_cache(cache)
+        return cache
+
+    def engine(self, name):
+        """Return the engine for an extension set, building it on first use"""
+        md = self.engines.get(name)
+        if md is None:
+            start = time.perf_counter()
+            import markdown
+            md = markdown.Markdown(**self.configs[name])
+            self.stats.setup_time += time.perf_counter() - start
+            self.stats.engines += 1
+            self.engines[name] = md
+        return md
+
+    def document_summary(self, name):
+        """(summary, word count) of the last document converted with an extension set
+
+        Only extension sets with sitegen.summary_extension have one.
+        """
+        md = self.engines[name]
+        return md.summary, md.word_count
+
+    def convert(self, name, text):
+        """Convert Markdown text to HTML with the named extension set"""
+        md = self.engine(name)
+        start = time.perf_counter()
+        md.reset()
+        html = md.convert(text)
+        self.stats.convert_time += time.perf_counter() - start
+        self.stats.documents += 1
+        return html
+
+
+# Engines are not thread-safe, but each build process only renders one
+# document at a time
+renderer = MarkdownRenderer()
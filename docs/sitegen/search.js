@@ -0,0 +1,159 @@
+// Client for the prebuilt search index written by build.py --search.
+// Fetches index.json once, then only the shards holding the query's terms
+// and the document chunks holding the top results. Ranking is BM25; the
+// last query word also matches as a prefix, so results update while typing.
+(function () {
+    'use strict';
+
+    const BASE = '/search/';
+    const K1 = 1.2;
+    const B = 0.75;
+
+    let meta = null;
+    let stopwords = null;
+    const shardCache = new Map();
+    const docCache = new Map();
+
+    function fetchJSON(name) {
+        return fetch(BASE + name).then(function (response) {
+            if (!response.ok) {
+                throw new Error('Could not load ' + name + ': ' + response.status);
+            }
+            return response.json();
+        });
+    }
+
+    function loadMeta() {
+        if (meta === null) {
+            meta = fetchJSON('index.json').then(function (data) {
+                stopwords = new Set(data.stopwords);
+                return data;
+            });
+        }
+        return meta;
+    }
+
+    function cached(cache, name) {
+        if (!cache.has(name)) {
+            cache.set(name, fetchJSON(name));
+        }
+        return cache.get(name);
+    }
+
+    // Must match normalize() and tokenize() in sitegen/search.py
+    function tokenize(text, index) {
+        const words = text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase()
+            .match(/[\p{L}\p{N}]+/gu) || [];
+        return words.filter(function (word) {
+            return word.length >= index.minLength && word.length <= index.maxLength && !stopwords.has(word);
+        });
+    }
+
+    // FNV-1a over the term's prefix; must match shard_of() in sitegen/search.py
+    function shardOf(term, index) {
+        let h = 0x811c9dc5;
+        for (const ch of Array.from(term).slice(0, index.prefix)) {
+            h ^= ch.codePointAt(0);
+            h = Math.imul(h, 0x01000193) >>> 0;
+        }
+        return h % index.shards.length;
+    }
+
+    async function search(query, limit) {
+        limit = limit || 10;
+        const index = await loadMeta();
+        const terms = tokenize(query, index);
+        if (terms.length === 0) {
+            return [];
+        }
+
+        const shards = await Promise.all(terms.map(function (term) {
+            return cached(shardCache, index.shards[shardOf(term, index)]);
+        }));
+
+        const scores = new Map();
+        const matched = new Map();
+        terms.forEach(function (term, i) {
+            const shard = shards[i];
+            const isLast = i === terms.length - 1;
+            const seen = new Set();
+            for (const candidate in shard) {
+                if (candidate !== term && !(isLast && candidate.startsWith(term))) {
+                    continue;
+                }
+                const postings = shard[candidate];
+                const df = postings.length / 2;
+                const idf = Math.log(1 + (index.count - df + 0.5) / (df + 0.5));
+                for (let p = 0; p < postings.length; p += 2) {
+                    const doc = postings[p];
+                    const tf = postings[p + 1];
+                    const norm = 1 - B + B * index.lengths[doc] / index.averageLength;
+                    const score = idf * tf * (K1 + 1) / (tf + K1 * norm);
+                    scores.set(doc, (scores.get(doc) || 0) + score);
+                    seen.add(doc);
+                }
+            }
+            seen.forEach(function (doc) {
+                matched.set(doc, (matched.get(doc) || 0) + 1);
+            });
+        });
+
+        // Posts matching more of the query rank first, then by score
+        const ranked = Array.from(scores.keys()).sort(function (a, b) {
+            return (matched.get(b) - matched.get(a)) || (scores.get(b) - scores.get(a)) || (a - b);
+        }).slice(0, limit);
+
+        const chunks = await Promise.all(ranked.map(function (doc) {
+            return cached(docCache, index.docs[Math.floor(doc / index.docsPerChunk)]);
+        }));
+        return ranked.map(function (doc, i) {
+            const entry = chunks[i][doc % index.docsPerChunk];
+            return { url: entry[0], title: entry[1], date: entry[2], summary: entry[3], score: scores.get(doc) };
+        });
+    }
+
+    function escapeHTML(text) {
+        return text.replace(/[&<>"']/g, function (ch) {
+            return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[ch];
+        });
+    }
+
+    function bind(input, output) {
+        let latest = 0;
+        async function update() {
+            const query = input.value;
+            const ticket = ++latest;
+            const results = query.trim() ? await search(query, 20) : [];
+            if (ticket !== latest) {
+                return;
+            }
+            if (query.trim() && results.length === 0) {
+                output.innerHTML = '<p class="search-empty">No posts found.</p>';
+                return;
+            }
+            output.innerHTML = results.map(function (result) {
+                return '<div class="archive-item"><time class="archive-date">' + escapeHTML(result.date) +
+                    '</time><a href="' + escapeHTML(result.url) + '" class="archive-title">' +
+                    escapeHTML(result.title) + '</a><p class="search-summary">' +
+                    escapeHTML(result.summary) + '</p></div>';
+            }).join('');
+        }
+
+        input.addEventListener('input', update);
+        const params = new URLSearchParams(location.search);
+        if (params.has('q')) {
+            input.value = params.get('q');
+            update();
+        }
+    }
+
+    window.siteSearch = search;
+
+    document.addEventListener('DOMContentLoaded', function () {
+        const input = document.getElementById('search-input');
+        const output = document.getElementById('search-results');
+        if (input && output) {
+            bind(input, output);
+        }
+    });
+})();
@@ -0,0 +1,168 @@
+"""
+Prebuilt client-side search index.
+Post titles, summaries, and body text are tokenized into an inverted index
+with term-frequency postings. Terms are split into shards by a hash of
+their first characters, so the client only fetches the shards holding the
+terms it looks up; a term and every longer term sharing its prefix always
+land in the same shard. Each post's terms are cached with its source hash,
+so an incremental build only re-tokenizes the posts it re-renders.
+"""
+
+import html
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from sitegen.manifest import hash_bytes
+
+INDEX_VERSION = 1
+# Terms sharing this many leading characters share a shard
+SHARD_PREFIX = 2
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+# Roughly how many postings go in one shard, and how many documents in one
+# chunk of the document table
+SHARD_POSTINGS = 20000
+DOCS_PER_CHUNK = 500
+
+# Title words count three times, summary words twice, body words once
+FIELD_WEIGHTS = (("title", 3), ("summary", 2), ("body", 1))
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have if in into is it its of on or
+so that the their then there these they this to was were which will with we
+you your i not can do does our than them what when where who how all any
+""".split())
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize(text):
+    """Lowercase and strip accents and other marks, the same way the JS client does"""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.category(ch).startswith("M")).lower()
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_RE.findall(normalize(text))
+            if MIN_TERM_LENGTH <= len(token) <= MAX_TERM_LENGTH and token not in STOPWORDS]
+
+
+def html_to_text(fragment):
+    return html.unescape(_TAG_RE.sub(" ", fragment))
+
+
+def shard_of(term, shard_count):
+    """FNV-1a hash of a term's prefix; mirrored by shardOf() in search.js"""
+    h = 0x811c9dc5
+    for ch in term[:SHARD_PREFIX]:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xffffffff
+    return h % shard_count
+
+
+def post_terms(title, summary, body_html):
+    """Weighted term frequencies and the length, in tokens, of one post"""
+    fields = {"title": title, "summary": summary, "body": html_to_text(body_html)}
+    counts = Counter()
+    length = 0
+    for field, weight in FIELD_WEIGHTS:
+        tokens = tokenize(fields[field])
+        length += len(tokens) * weight
+        for token in tokens:
+            counts[token] += weight
+    return {"terms": dict(counts), "length": length}
+
+
+class SearchIndex:
+    """Per-post terms cached between builds, and the sharded index built from them"""
+
+    def __init__(self, cache_path, entries=None):
+        self.cache_path = Path(cache_path)
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(cache_path)
+        if data.get('version') != INDEX_VERSION:
+            return cls(cache_path)
+        return cls(cache_path, data['posts'])
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'posts': self.entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
+
+    def has(self, key, source_hash):
+        entry = self.entries.get(key)
+        return entry is not None and entry['hash'] == source_hash
+
+    def update(self, key, source_hash, slug, terms):
+        self.entries[key] = {'hash': source_hash, 'slug': slug, **terms}
+
+    def forget(self, key):
+        self.entries.pop(key, None)
+
+    def build(self, posts, date_format):
+        """Build the index files for posts, in the order results tie-break in
+
+        Returns {file name: JSON text}. Shard and document files are named
+        after their contents so they can be cached forever; index.json,
+        which lists them, is the only file a client revalidates.
+        """
+        by_slug = {entry['slug']: entry for entry in self.entries.values()}
+        docs = []
+        lengths = []
+        postings = {}
+        for post in posts:
+            entry = by_slug.get(post['slug'])
+            if entry is None:
+                continue
+            doc_id = len(docs)
+            docs.append([f"/post/{post['slug']}/", post['title'], date_format(post['date']), post['summary']])
+            lengths.append(entry['length'])
+            for term, tf in entry['terms'].items():
+                postings.setdefault(term, []).extend((doc_id, tf))
+
+        total = sum(len(values) // 2 for values in postings.values())
+        shard_count = max(1, min(1024, math.ceil(total / SHARD_POSTINGS)))
+        shards = [{} for _ in range(shard_count)]
+        for term in sorted(postings):
+            shards[shard_of(term, shard_count)][term] = postings[term]
+
+        files = {}
+
+        def add(stem, value):
+            text = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+            name = f"{stem}.{hash_bytes(text.encode('utf-8'))[:12]}.json"
+            files[name] = text
+            return name
+
+        shard_names = [add(f"shard-{number}", shard) for number, shard in enumerate(shards)]
+        doc_names = [add(f"docs-{start // DOCS_PER_CHUNK}", docs[start:start + DOCS_PER_CHUNK])
+                     for start in range(0, len(docs), DOCS_PER_CHUNK)]
+        files["index.json"] = json.dumps({
+            'version': INDEX_VERSION,
+            'prefix': SHARD_PREFIX,
+            'minLength': MIN_TERM_LENGTH,
+            'maxLength': MAX_TERM_LENGTH,
+            'stopwords': sorted(STOPWORDS),
+            'docsPerChunk': DOCS_PER_CHUNK,
+            'count': len(docs),
+            'averageLength': sum(lengths) / len(lengths) if lengths else 0,
+            'lengths': lengths,
+            'shards': shard_names,
+            'docs': doc_names,
+        }, separators=(',', ':'))
+        return files
@@ -0,0 +1,83 @@
+"""
+Markdown extension that summarises each document from its element tree.
+A tree-processor runs once the rest of the tree is built, in the same
+conversion: the summary is the rendered text of the first paragraph, so
+emphasis markers and link URLs are gone and code spans keep their text,
+and words are counted over the whole tree. Code blocks and raw HTML are
+still stashed as placeholders then, so neither is counted. Results are
+left on the engine as md.summary and md.word_count until the next reset().
+Loaded by name ('sitegen.summary_extension') when an engine is built.
+"""
+
+import html
+import re
+
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AMP_SUBSTITUTE
+
+# Summaries longer than this are cut at a word boundary
+SUMMARY_LENGTH = 200
+
+_PLACEHOLDER_RE = re.compile('\x02[^\x03]*\x03')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _skipped(element):
+    # Footnote reference numbers and back-links aren't part of the prose
+    return element.tag == 'sup' or 'footnote-backref' in element.get('class', '')
+
+
+def element_text(element):
+    """Plain text of an element and its descendants, placeholders removed"""
+    return html.unescape(_PLACEHOLDER_RE.sub(" ", _text(element).replace(AMP_SUBSTITUTE, "&")))
+
+
+def _text(element):
+    parts = [element.text or ""]
+    for child in element:
+        if not _skipped(child):
+            parts.append(_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def shorten(text, max_length=SUMMARY_LENGTH):
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(",;:") + "..."
+
+
+class SummaryTreeprocessor(Treeprocessor):
+    def run(self, root):
+        summary = ""
+        for element in root:
+            if element.tag == 'p':
+                summary = _SPACE_RE.sub(" ", element_text(element)).strip()
+                if summary:
+                    break
+        self.md.summary = shorten(summary)
+        self.md.word_count = len(element_text(root).split())
+
+
+class SummaryExtension(Extension):
+    """Record each document's summary and word count on the engine"""
+
+    def extendMarkdown(self, md):
+        md.registerExtension(self)
+        self.md = md
+        self.reset()
+        # After every other tree-processor, once prettify has put
+        # whitespace between block elements and escapes are undone
+        md.treeprocessors.register(SummaryTreeprocessor(md), 'summary', -1)
+
+    def reset(self):
+        self.md.summary = ""
+        self.md.word_count = 0
+
+
+def makeExtension(**kwargs):
+    return SummaryExtension(**kwargs)
@@ -0,0 +1,68 @@
+"""
+Pre-compiled page template.
+base-template.html is read once and split at its {{PLACEHOLDER}} markers,
+so rendering a page is a single join instead of a chain of str.replace()
+calls that each copy the whole template.
+"""
+
+import re
+from pathlib import Path
+
+PLACEHOLDER_RE = re.compile(r'\{\{([A-Z][A-Z0-9_]*)\}\}')
+
+
+class TemplateError(ValueError):
+    """Raised when a template is rendered without a value for one of its slots"""
+
+
+class Template:
+    """A template split into static chunks and named slots"""
+
+    def __init__(self, text, name="template"):
+        self.name = name
+        # Even indices are static text, odd indices are slot names
+        self.parts = PLACEHOLDER_RE.split(text)
+        self.slots = frozenset(self.parts[1::2])
+
+    @classmethod
+    def load(cls, path):
+        """Read and compile a template file"""
+        path = Path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), name=path.name)
+
+    def partial(self, **values):
+        """Return a copy with some slots filled in ahead of time"""
+        parts = self.parts[:]
+        parts[1::2] = [values.get(slot, "{{%s}}" % slot) for slot in parts[1::2]]
+        return Template("".join(parts), self.name)
+
+    def _check(self, values):
+        missing = self.slots.difference(values)
+        if missing:
+            names = ", ".join("{{%s}}" % slot for slot in sorted(missing))
+            raise TemplateError(f"{self.name}: no value given for {names}")
+
+    def render(self, **values):
+        """Fill every slot and return the page"""
+        self._check(values)
+        parts = self.parts[:]
+        parts[1::2] = [values[slot] for slot in parts[1::2]]
+        return "".join(parts)
+
+    def render_chunks(self, **values):
+        """Fill every slot, yielding the page a chunk at a time
+
+        A value may be a string or an iterable of strings, so a long slot
+        such as the archive list never has to exist as one string.
+        """
+        self._check(values)
+        for index, part in enumerate(self.parts):
+            if index % 2 == 0:
+                yield part
+                continue
+            value = values[part]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value